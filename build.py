@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 import os
 import shutil
-import markdown
+import pickle
+import functools
+import hashlib
 import re
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from jinja2 import Environment, FileSystemLoader
 
 # Configuration
 CONTENT_DIR = 'content/posts'
@@ -13,6 +15,37 @@ OUTPUT_DIR = 'docs'
 TEMPLATE_DIR = 'templates'
 STATIC_DIR = 'static'
 LOOKUP_FILE = 'lesson_lookups.txt'
+CACHE_FILE = os.path.join(OUTPUT_DIR, '.build-cache.pkl')
+JINJA_CACHE_DIR = '.jinja-cache'
+
+# Precompiled patterns used on every post
+# Allow optional 'T' between date and time
+# Use stricter regex to avoid swallowing preceding text lines, but allow text on the SAME line (like NOTES [[...]])
+# Also support time formats like HHMM (4 digits) or HH:MM
+_TS_SPLIT_RE = re.compile(r'((?:^|\n).*?\[\[\s*\d{4}[/ ]\d{2}[/ ]\d{2}[ T](?:\d{2}:\d{2}:\d{2}|\d{2}:\d{2}|\d{4}) \(?[A-Z]{3}\)?\s*\]\])')
+# First full timestamp in a post, used for sorting entries
+_TS_SEARCH_RE = re.compile(r'\[\[\s*(\d{4}[/ ]\d{2}[/ ]\d{2}[ T]\d{2}:\d{2}:\d{2})')
+# << tag, tag >> markers
+_TAG_RE = re.compile(r'<<\s*(.*?)\s*>>')
+# Bullet point starting with 'module' (case insensitive) and ending with a number
+_MODULE_RE = re.compile(r'(\s*[-*+]\s+)([Mm]odule\b.*?(\d+(?:\.\d+)?))\s*$')
+_ASTRO_KEYWORD_RE = re.compile(r'(Location:|Sunrise:|Moon phase:)')
+# Dynamic build timestamp in the footer (support EST and UTC)
+_INDEX_TIME_RE = re.compile(r'updated last: \d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2} (EST|UTC)')
+
+# Shared converter; reset() between posts instead of reloading extensions each time
+_MD = None
+
+def _get_markdown():
+    """
+    Returns the shared Markdown converter, importing markdown on first use
+    so that builds with nothing to parse never load it.
+    """
+    global _MD
+    if _MD is None:
+        import markdown
+        _MD = markdown.Markdown(extensions=['extra'])
+    return _MD
 
 def load_lookups():
     lookups = {}
@@ -24,76 +57,216 @@ def load_lookups():
                     lookups[parts[0]] = parts[1]
     return lookups
 
+def load_cache():
+    """
+    Loads the parse cache from a previous build.
+    Returns an empty cache if it is missing or unreadable.
+    """
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            cache = pickle.load(f)
+        if isinstance(cache, dict):
+            return cache
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        pass
+    return {}
+
+def save_cache(cache):
+    with open(CACHE_FILE, 'wb') as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+
 def slugify(value):
     """
     Normalizes string, converts to lowercase, removes non-alpha characters,
     and converts spaces to hyphens.
     """
-    import unicodedata
-    value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
-    value = re.sub(r'[^\w\s-]', '', value.lower())
-    return re.sub(r'[-\s]+', '-', value).strip('-')
+    if not value.isascii():
+        import unicodedata
+        value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
+    # One pass: keep word characters, collapse runs of spaces and hyphens into one hyphen
+    out = []
+    for c in value.lower():
+        if c.isalnum() or c == '_':
+            out.append(c)
+        elif (c == '-' or c.isspace()) and out and out[-1] != '-':
+            out.append('-')
+    return ''.join(out).strip('-')
+
+def _bullet_char(line):
+    """
+    Returns the list indicator (-, * or +) of a bullet line, or None.
+    """
+    s = line.lstrip()
+    if s[:1] in ('-', '*', '+') and s[1:2].isspace():
+        return s[0]
+    return None
+
+def format_lines(body, lookups=None, filepath=None):
+    """
+    Single pass over the lines of a post body that:
+      - links bullet points like 'Module 1.2' using the lesson lookups
+      - adds an empty line after a bullet or indented line followed by text,
+        so the text is not swallowed into the list item
+      - starts a new list if the bullet indicator changes (*, -, +)
+      - wraps bullet blocks with astro data in a div for specific styling
+    Blank lines just before a line count towards its indentation, and a linked
+    module line absorbs the blank lines after it. A bare indicator with no text
+    after it is treated as plain text.
+    """
+    lines = body.split('\n')
+    n = len(lines)
+    out = []
+    astro_block = []
+
+    def flush_astro(at_end=False):
+        if not astro_block:
+            return
+        if _ASTRO_KEYWORD_RE.search('\n'.join(astro_block)):
+            out.append('<div class="astro-data" markdown="1">')
+            out.append('')
+            out.extend(astro_block)
+            if at_end:
+                out.extend(['</div>', ''])
+            else:
+                out.extend(['', '</div>'])
+        else:
+            out.extend(astro_block)
+        astro_block.clear()
+
+    def emit(line):
+        # Continuous lines starting with a bullet form a candidate astro block
+        s = line.lstrip(' \t')
+        if s and s[0] in '*•-':
+            astro_block.append(line)
+        else:
+            flush_astro()
+            out.append(line)
+
+    blank_run = 0  # characters of blank lines (with newlines) just before the current line
+    i = 0
+    while i < n:
+        line = lines[i]
+        nxt = i + 1
+
+        if not line.strip():
+            blank_run += len(line) + 1
+            emit(line)
+            i = nxt
+            continue
+
+        if lookups:
+            match = _MODULE_RE.match(line)
+            if match:
+                number = match.group(3)
+                if number in lookups:
+                    line = f"{match.group(1)}[{match.group(2)}]({lookups[number]})"
+                    while nxt < n and not lines[nxt].strip():
+                        nxt += 1
+                else:
+                    print(f"Warning: No lookup found for module {number} in {filepath}")
+
+        bullet = _bullet_char(line)
+        indent = blank_run + len(line) - len(line.lstrip())
+        first = lines[nxt][:1] if nxt < n else ''
+        # Ensure empty line after bullet points if followed by text
+        gap = bool((bullet or indent >= 2) and first and first not in ' \t-*]')
+        if not gap and blank_run >= 3 and line[0] not in ' \t-*]':
+            # Blank lines holding two or more characters act as an indented line
+            emit('')
+
+        emit(line)
+
+        # Start a new list if the next bullet (past blank lines) uses another indicator
+        if bullet:
+            following = nxt
+            while following < n and not lines[following].strip():
+                following += 1
+            if following < n:
+                next_bullet = _bullet_char(lines[following])
+                if next_bullet and next_bullet != bullet:
+                    emit('')
+
+        if gap:
+            emit('')
+
+        blank_run = 0
+        i = nxt
+
+    flush_astro(at_end=True)
+    return '\n'.join(out)
 
 def parse_post(filepath, lookups=None):
-    with open(filepath, 'r') as f:
+    with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
 
+    # Extract first timestamp for sorting from the raw text, before any rewriting
+    ts_match = _TS_SEARCH_RE.search(content)
+    sort_key = ts_match.group(1) if ts_match else "9999/99/99 99:99:99"
+    if ts_match:
+        # Normalize all separators to slashes (YYYY/MM/DD/HH:MM:SS) for string sort
+        sort_key = sort_key.replace(' ', '/').replace('T', '/')
+
     # Simple frontmatter parser
     frontmatter = {}
     body = content
     
-    # Strip leading whitespace for the check
-    if content.lstrip().startswith('---'):
-        # Split on the *first* two occurrences of ---
-        # We need to be careful not to strip *too* much if we split on raw content
-        # But for '---' splitting, using the original content is safer if we just find the indices.
-        # Alternatively, just use the split logic on the stripped content if we don't mind losing leading newlines in body.
-        
-        parts = content.lstrip().split('---', 2)
-        if len(parts) >= 3:
-            raw_fm = parts[1]
-            body = parts[2]
-            for line in raw_fm.strip().split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    val = value.strip()
-                    if val.lower() == 'true':
-                        val = True
-                    elif val.lower() == 'false':
-                        val = False
-                    frontmatter[key.strip()] = val
+    # Skip leading whitespace by index rather than copying the content with lstrip()
+    start = 0
+    n = len(content)
+    while start < n and content[start] in ' \t\r\n':
+        start += 1
+
+    if content.startswith('---', start):
+        # Frontmatter runs up to the next ---, which may close a line (e.g. 'future: false---')
+        end = content.find('---', start + 3)
+        if end != -1:
+            body = content[end + 3:]
+            # Scan key: value lines in place, without splitting the block into lists
+            pos = start + 3
+            while pos < end:
+                line_end = content.find('\n', pos, end)
+                if line_end == -1:
+                    line_end = end
+                colon = content.find(':', pos, line_end)
+                if colon != -1:
+                    val = content[colon + 1:line_end].strip()
+                    # Only short values can be booleans; skip lower() on the rest
+                    if len(val) <= 5:
+                        flag = val.lower()
+                        if flag == 'true':
+                            val = True
+                        elif flag == 'false':
+                            val = False
+                    frontmatter[content[pos:colon].strip()] = val
+                pos = line_end + 1
 
     # Add <hr/> before second and subsequent timestamps and handle tags
-    # Allow optional 'T' between date and time
-    # Use stricter regex to avoid swallowing preceding text lines, but allow text on the SAME line (like NOTES [[...]])
-    # Also support time formats like HHMM (4 digits) or HH:MM
-    timestamp_pattern = r'((?:^|\n).*?\[\[\s*\d{4}[/ ]\d{2}[/ ]\d{2}[ T](?:\d{2}:\d{2}:\d{2}|\d{2}:\d{2}|\d{4}) \(?[A-Z]{3}\)?\s*\]\])'
-    parts = re.split(timestamp_pattern, body)
+    parts = _TS_SPLIT_RE.split(body)
     
     found_tags = []
     
     def process_tags(text, extract=False):
-        extracted_html = ""
+        extracted = []
         def replace_tag_match(match):
-            nonlocal extracted_html
             raw_tags = match.group(1)
             tags_list = [t.strip() for t in raw_tags.split(',')]
             
-            html_list = '<ul class="entry-tags">'
+            pieces = ['<ul class="entry-tags">']
             for tag in tags_list:
                 slug = slugify(tag)
                 found_tags.append({'name': tag, 'slug': slug})
-                html_list += f'<li><a href="tag_{slug}.html">{tag}</a></li>'
-            html_list += "</ul>"
+                pieces.append(f'<li><a href="tag_{slug}.html">{tag}</a></li>')
+            pieces.append("</ul>")
+            html_list = "".join(pieces)
             
             if extract:
-                extracted_html += html_list
+                extracted.append(html_list)
                 return ""
             else:
                 return html_list
 
-        new_text = re.sub(r'<<\s*(.*?)\s*>>', replace_tag_match, text)
-        return new_text, extracted_html
+        new_text = _TAG_RE.sub(replace_tag_match, text)
+        return new_text, "".join(extracted)
 
     if len(parts) == 1:
         # No timestamps found, process tags
@@ -117,30 +290,17 @@ def parse_post(filepath, lookups=None):
             ts_raw = parts[idx].strip()
             entry_content = parts[idx+1]
             
-            # Split into Title and Timestamp if title exists
-            header_split_match = re.match(r'^(.*?)(\[\[.*?\]\])$', ts_raw, re.DOTALL)
-            if header_split_match:
-                title_part = header_split_match.group(1).strip()
-                ts_part = header_split_match.group(2).strip()
-                if title_part:
-                    ts = f"{title_part}<br/>{ts_part}"
-                else:
-                    ts = ts_part
+            # Split into Title and Timestamp if title exists; the split pattern
+            # guarantees a '[[' and a closing ']]' in every header
+            cut = ts_raw.find('[[')
+            title_part = ts_raw[:cut].strip()
+            ts_part = ts_raw[cut:]
+            if title_part:
+                ts = f"{title_part}<br/>{ts_part}"
             else:
-                ts = ts_raw
+                ts = ts_part
             
-            # Check if timestamp is in the future
-            ts_match = re.search(r'\[\[\s*(\d{4}[/ ]\d{2}[/ ]\d{2})', ts)
-            is_future_ts = False
-            if ts_match:
-                ts_date_str = ts_match.group(1).replace('/', '-').replace(' ', '-')
-                ts_date = datetime.strptime(ts_date_str, "%Y-%m-%d").date()
-            
-            classes = ["timestamp-header"]
-            if is_future_ts:
-                classes.append("future-warning")
-            
-            ts_html = f'<h3 class="{" ".join(classes)}">{ts}</h3>'
+            ts_html = f'<h3 class="timestamp-header">{ts}</h3>'
 
             # Process tags in content, extracting them
             cleaned_content, tag_markup = process_tags(entry_content, extract=True)
@@ -167,71 +327,18 @@ def parse_post(filepath, lookups=None):
             
         body = "".join(new_body_parts)
 
-    # Process bullet point links
-
-    # Process bullet point links
-    if lookups:
-        # Match bullet points starting with 'module' (case insensitive) and ending with a number
-        pattern = re.compile(r'^(\s*[-*+]\s+)([Mm]odule\b.*?(\d+(?:\.\d+)?))\s*$', re.MULTILINE)
-        def replace_link(match):
-            prefix = match.group(1)
-            content = match.group(2)
-            number = match.group(3)
-            if number in lookups:
-                return f"{prefix}[{content}]({lookups[number]})"
-            print(f"Warning: No lookup found for module {number} in {filepath}")
-            return match.group(0)
-        body = pattern.sub(replace_link, body)
-
-    # Ensure empty line after bullet points if followed by text
-    # This prevents the next line from being swallowed into the list item
-    body = re.sub(r'(^(\s*[-*+]\s+|\s{2,}).*)\n(?=[^ \t\n\-\*\]])', r'\1\n\n', body, flags=re.MULTILINE)
-
-    # Start a new list if bullet indicator changes (*, -, +)
-    def bullet_breaker(match):
-        b1 = match.group(2).strip()
-        b2 = match.group(4).strip()
-        if b1 != b2:
-            return match.group(1) + "\n\n"
-        return match.group(1) + "\n"
-
-    body = re.sub(r'(^(\s*[-*+])\s+.*)\n(?=(\s*([-*+])\s+.*))', bullet_breaker, body, flags=re.MULTILINE)
-
-    # Wrap Astro data list in a div for specific styling
-    def wrap_astro_data(text):
-        # Regex to find a block of list items
-        # Matches continuous lines starting with a bullet
-        list_block_pattern = re.compile(r'((?:^[ \t]*[*•-].*?(?:\n|$))+)', re.MULTILINE)
-        
-        def check_and_wrap(match):
-            block = match.group(1)
-            # Check for Astro keywords
-            if re.search(r'(Location:|Sunrise:|Moon phase:)', block):
-                return f'<div class="astro-data" markdown="1">\n\n{block}\n</div>\n'
-            return block
-
-        return list_block_pattern.sub(check_and_wrap, text)
+    # Module links, list spacing and astro-data wrapping in one pass over the lines
+    body = format_lines(body, lookups=lookups, filepath=filepath)
 
-    body = wrap_astro_data(body)
-
-    # Extract first timestamp for sorting
-    ts_match = re.search(r'\[\[\s*(\d{4}[/ ]\d{2}[/ ]\d{2}[ T]\d{2}:\d{2}:\d{2})', body)
-    sort_key = ts_match.group(1) if ts_match else "9999/99/99 99:99:99"
-    # Normalize sort key to have slashes and single space
-    if ts_match:
-        sort_key = sort_key.replace(' ', '/').replace('T', '/') # Normalize all to same separator for string sort
-        # Wait, if I replace space with slash it becomes YYYY/MM/DD/HH:MM:SS
-        # This works for sorting.
-
-    html_content = markdown.markdown(body, extensions=['extra'])
+    html_content = _get_markdown().reset().convert(body)
     
     # Infer date/title if missing
     filename = os.path.basename(filepath)
     if 'date' not in frontmatter:
         # Try to parse from filename YYYY-MM-DD
-        match = re.match(r'(\d{4}-\d{2}-\d{2})', filename)
-        if match:
-            frontmatter['date'] = match.group(1)
+        date_part = filename[:10]
+        if date_part[4:5] == '-' and date_part[7:8] == '-' and date_part.replace('-', '', 2).isdigit():
+            frontmatter['date'] = date_part
         else:
             frontmatter['date'] = datetime.now().strftime('%Y-%m-%d')
 
@@ -248,24 +355,109 @@ def parse_post(filepath, lookups=None):
         'raw_content': content
     }
 
-def write_if_changed(path, content, force=False):
+def parse_posts(filepaths, lookups=None):
+    """
+    Parses several posts, spreading the markdown work over a process pool.
+    Returns the parsed posts in the same order as filepaths.
+    """
+    parse = functools.partial(parse_post, lookups=lookups)
+    if len(filepaths) < 2:
+        return [parse(filepath) for filepath in filepaths]
+    with ProcessPoolExecutor() as ex:
+        return list(ex.map(parse, filepaths, chunksize=8))
+
+_ENV = None
+
+def _get_env():
+    """
+    Returns the Jinja2 environment, creating it on first use (also in pool workers).
+    """
+    global _ENV
+    if _ENV is None:
+        from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+        # Compiled templates are kept on disk between builds; template changes are
+        # already tracked through global_mtime, so Jinja need not re-stat them
+        os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+        _ENV = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            bytecode_cache=FileSystemBytecodeCache(JINJA_CACHE_DIR),
+            auto_reload=False
+        )
+    return _ENV
+
+def _render_page(job):
+    output_path, context = job
+    # Source text of cached entries is read here, so pool workers read in parallel
+    for entry in context['entries']:
+        if entry['raw_content'] is None:
+            with open(os.path.join(CONTENT_DIR, entry['filename']), 'r', encoding='utf-8') as f:
+                entry['raw_content'] = f.read()
+    # Render daily page straight to disk, without holding the whole page in memory
+    _get_env().get_template('post.html').stream(**context).dump(output_path, encoding='utf-8')
+
+def render_pages(jobs):
+    """
+    Renders daily pages from (output_path, context) pairs, using a process pool
+    when there is more than one page.
+    """
+    if len(jobs) < 2:
+        for job in jobs:
+            _render_page(job)
+        return
+    with ProcessPoolExecutor() as ex:
+        list(ex.map(_render_page, jobs, chunksize=4))
+
+def _scan_files(path):
+    """
+    Yields a DirEntry for every file below path, recursing into subdirectories.
+    """
+    with os.scandir(path) as it:
+        entries = list(it)
+    for entry in entries:
+        if entry.is_dir():
+            yield from _scan_files(entry.path)
+        else:
+            yield entry
+
+def link_or_copy(src, dest):
+    """
+    Mirrors src at dest with a hardlink, so no bytes are copied.
+    Falls back to a regular copy across filesystems or where links are unsupported.
+    """
+    if os.path.lexists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+def write_if_changed(path, content, force=False, hashes=None):
     """
     Writes content to path only if it differs from existing content (ignoring timestamp).
+    If a hashes dict is given, it maps paths to the hash of what was last written there,
+    so an unchanged page is detected without reading the old file back.
     Returns True if written, False otherwise.
     """
+    # Normalize: Remove the dynamic timestamp for comparison
+    norm_new = _INDEX_TIME_RE.sub('', content)
+    known = None
+    if hashes is not None:
+        digest = hashlib.blake2b(norm_new.encode(), digest_size=16).digest()
+        known = hashes.get(path)
+        hashes[path] = digest
+
     should_write = True
     if not force and os.path.exists(path):
-        with open(path, 'r') as f:
-            current_content = f.read()
-        
-        # Normalize: Remove the dynamic timestamp for comparison (support EST and UTC)
-        time_pattern = r'updated last: \d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2} (EST|UTC)'
-        
-        norm_new = re.sub(time_pattern, '', content)
-        norm_old = re.sub(time_pattern, '', current_content)
-        
-        if norm_new == norm_old:
-            should_write = False
+        if known is not None:
+            should_write = known != digest
+        else:
+            with open(path, 'r') as f:
+                current_content = f.read()
+            
+            norm_old = _INDEX_TIME_RE.sub('', current_content)
+            
+            if norm_new == norm_old:
+                should_write = False
 
     if should_write:
         with open(path, 'w') as f:
@@ -274,6 +466,142 @@ def write_if_changed(path, content, force=False):
     
     return should_write
 
+def _global_mtime():
+    """
+    Returns the newest mtime of the global dependencies: the build script,
+    the templates and the lookups file.
+    """
+    global_mtime = os.stat(__file__).st_mtime
+    for template in _scan_files(TEMPLATE_DIR):
+        global_mtime = max(global_mtime, template.stat().st_mtime)
+    if os.path.exists(LOOKUP_FILE):
+        global_mtime = max(global_mtime, os.stat(LOOKUP_FILE).st_mtime)
+    return global_mtime
+
+def _parse_deps():
+    # Parsed posts are reused while the source file is unchanged (mtime + size).
+    # The whole cache is dropped when the parser or the lookups change.
+    return (
+        os.stat(__file__).st_mtime_ns,
+        os.stat(LOOKUP_FILE).st_mtime_ns if os.path.exists(LOOKUP_FILE) else None
+    )
+
+def _scan_posts():
+    if not os.path.exists(CONTENT_DIR):
+        return []
+    with os.scandir(CONTENT_DIR) as it:
+        return [e for e in it if e.name.endswith('.md')]
+
+def _cache_entry(st, post):
+    # The source text is left out of the cache; it is re-read if the page is rendered
+    return (
+        st.st_mtime_ns, st.st_size,
+        {k: v for k, v in post.items() if k != 'raw_content'}
+    )
+
+def _add_post(posts_by_date, all_tags, file, post, file_mtime):
+    """
+    Adds a parsed post to its daily page group and to the pages of its tags.
+    """
+    date = post['metadata'].get('date')
+    
+    # Aggregate tags
+    daily_url = f"{date}.html"
+    for tag in post['tags']:
+        if tag['slug'] not in all_tags:
+            all_tags[tag['slug']] = {'name': tag['name'], 'slug': tag['slug'], 'posts': []}
+        
+        # Avoid duplicates per post if same tag appears multiple times
+        if not any(p['url'] == daily_url for p in all_tags[tag['slug']]['posts']):
+            all_tags[tag['slug']]['posts'].append({
+                'title': post['metadata'].get('title'),
+                'date': date,
+                'url': daily_url
+            })
+
+    if date not in posts_by_date:
+        posts_by_date[date] = {
+            'title': date,
+            'date': date,
+            'entries': [],
+            'url': f"{date}.html",
+            'max_mtime': 0,
+            'has_future': False
+        }
+    
+    # Update max_mtime for this date group
+    posts_by_date[date]['max_mtime'] = max(posts_by_date[date]['max_mtime'], file_mtime)
+
+    is_tech = file.endswith('-tech.md')
+    is_future = post['metadata'].get('future', False)
+    
+    if is_future:
+        posts_by_date[date]['has_future'] = True
+    
+    posts_by_date[date]['entries'].append({
+        'content': post['content'],
+        'image': post['metadata'].get('image'),
+        'sort_key': post['sort_key'],
+        'is_tech': is_tech,
+        'is_future': is_future,
+        'filename': file,
+        'raw_content': post.get('raw_content')
+    })
+
+def _index_entry(group):
+    """
+    Sorts the entries of a daily page group and returns its entry for the index.
+    """
+    # Sort entries: Tech last, then by timestamp
+    group['entries'].sort(key=lambda x: (x['is_tech'], x['sort_key'], x['filename']))
+    
+    # Collect images for index (first one)
+    first_image = next((e['image'] for e in group['entries'] if e['image']), '')
+    
+    return {
+        'title': group['title'],
+        'date': group['date'],
+        'url': group['url'],
+        'image': first_image,
+        'is_future': group['has_future']
+    }
+
+def _page_job(group, output_path, build_time):
+    """
+    Returns the (output_path, context) render job of a daily page group.
+    """
+    return (output_path, {
+        'title': group['title'],
+        'date': group['date'],
+        'entries': group['entries'],
+        'has_future': group['has_future'],
+        'build_time': build_time
+    })
+
+def _write_tag_page(template, data, output_prefix, build_time, force, hashes, tag_sigs):
+    """
+    Renders the page of one tag, unless its post list is the same as when it was
+    last rendered (tag_sigs maps slugs to that list). Returns the page filename.
+    """
+    tag_filename = f"tag_{data['slug']}.html"
+    tag_path = output_prefix + tag_filename
+    # Sort posts by date descending
+    sorted_posts = sorted(data['posts'], key=lambda x: x['date'], reverse=True)
+
+    sig = (data['name'], tuple((p['title'], p['date'], p['url']) for p in sorted_posts))
+    if not force and tag_sigs.get(data['slug']) == sig and os.path.exists(tag_path):
+        return tag_filename
+    tag_sigs[data['slug']] = sig
+    
+    tag_page_html = template.render(
+        tag_name=data['name'],
+        posts=sorted_posts,
+        build_time=build_time
+    )
+    
+    write_if_changed(tag_path, tag_page_html, force, hashes)
+    return tag_filename
+
 def build(force=False):
     # Setup output directory
     if not os.path.exists(OUTPUT_DIR):
@@ -284,185 +612,271 @@ def build(force=False):
         dest_static = os.path.join(OUTPUT_DIR, 'static')
         if not os.path.exists(dest_static):
             os.makedirs(dest_static)
-        for root, dirs, files in os.walk(STATIC_DIR):
-            rel_path = os.path.relpath(root, STATIC_DIR)
-            dest_root = os.path.join(dest_static, rel_path)
-            if not os.path.exists(dest_root):
-                os.makedirs(dest_root)
-            for file in files:
-                src_file = os.path.join(root, file)
-                dest_file = os.path.join(dest_root, file)
-                if not os.path.exists(dest_file) or os.stat(src_file).st_mtime > os.stat(dest_file).st_mtime:
-                    shutil.copy2(src_file, dest_file)
+        synced_static = set()
+        src_start = len(STATIC_DIR) + 1
+        made_dirs = {dest_static}
+        for src in _scan_files(STATIC_DIR):
+            dest_file = os.path.join(dest_static, src.path[src_start:])
+            synced_static.add(dest_file)
+            try:
+                stale = src.stat().st_mtime > os.stat(dest_file).st_mtime
+            except FileNotFoundError:
+                dest_root = os.path.dirname(dest_file)
+                if dest_root not in made_dirs:
+                    os.makedirs(dest_root, exist_ok=True)
+                    made_dirs.add(dest_root)
+                stale = True
+            if stale:
+                link_or_copy(src.path, dest_file)
+
+        # Remove copies of assets that no longer exist in STATIC_DIR
+        for dest in _scan_files(dest_static):
+            if dest.path not in synced_static:
+                print(f"Removing stale file: {os.path.relpath(dest.path, OUTPUT_DIR)}")
+                os.remove(dest.path)
 
     # Copy favicon.ico if it exists
     if os.path.exists('favicon.ico'):
-        shutil.copy2('favicon.ico', os.path.join(OUTPUT_DIR, 'favicon.ico'))
+        shutil.copyfile('favicon.ico', os.path.join(OUTPUT_DIR, 'favicon.ico'))
 
-    # Setup Jinja2
-    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
-    post_template = env.get_template('post.html')
-    index_template = env.get_template('index.html')
-    tags_template = env.get_template('tags.html')
-    tag_page_template = env.get_template('tag_page.html')
+    # Output files all live directly in OUTPUT_DIR
+    output_prefix = OUTPUT_DIR + os.sep
 
-    # Check global dependencies (templates + build script)
-    global_mtime = os.stat(__file__).st_mtime
-    for t_name in env.list_templates():
-        t_path = os.path.join(TEMPLATE_DIR, t_name)
-        if os.path.exists(t_path):
-            global_mtime = max(global_mtime, os.stat(t_path).st_mtime)
+    # Check global dependencies (templates + build script + lookups)
+    global_mtime = _global_mtime()
 
     posts_by_date = {}
     all_tags = {}  # { 'slug': { 'name': 'Name', 'posts': [] } }
     
     build_time = datetime.now(timezone.utc).strftime('%Y/%m/%d %H:%M:%S UTC')
     lookups = load_lookups()
-    
-    # Add lookup file to global_mtime
-    if os.path.exists(LOOKUP_FILE):
-        global_mtime = max(global_mtime, os.stat(LOOKUP_FILE).st_mtime)
 
-    if os.path.exists(CONTENT_DIR):
-        files = [f for f in os.listdir(CONTENT_DIR) if f.endswith('.md')]
-        
-        for file in files:
-            filepath = os.path.join(CONTENT_DIR, file)
-            # Optimization: We could read frontmatter only first, but files are small.
-            post = parse_post(filepath, lookups=lookups)
-            date = post['metadata'].get('date')
-            
-            # Aggregate tags
-            daily_url = f"{date}.html"
-            for tag in post['tags']:
-                if tag['slug'] not in all_tags:
-                    all_tags[tag['slug']] = {'name': tag['name'], 'slug': tag['slug'], 'posts': []}
-                
-                # Avoid duplicates per post if same tag appears multiple times
-                if not any(p['url'] == daily_url for p in all_tags[tag['slug']]['posts']):
-                    all_tags[tag['slug']]['posts'].append({
-                        'title': post['metadata'].get('title'),
-                        'date': date,
-                        'url': daily_url
-                    })
-
-            if date not in posts_by_date:
-                posts_by_date[date] = {
-                    'title': date,
-                    'date': date,
-                    'entries': [],
-                    'url': f"{date}.html",
-                    'max_mtime': 0,
-                    'has_future': False
-                }
-            
-            # Update max_mtime for this date group
-            file_mtime = os.stat(filepath).st_mtime
-            posts_by_date[date]['max_mtime'] = max(posts_by_date[date]['max_mtime'], file_mtime)
-
-            is_tech = file.endswith('-tech.md')
-            is_future = post['metadata'].get('future', False)
-            
-            if is_future:
-                posts_by_date[date]['has_future'] = True
-            
-            posts_by_date[date]['entries'].append({
-                'content': post['content'],
-                'image': post['metadata'].get('image'),
-                'sort_key': post['sort_key'],
-                'is_tech': is_tech,
-                'is_future': is_future,
-                'filename': file,
-                'raw_content': post['raw_content']
-            })
+    parse_deps = _parse_deps()
+    cache = {} if force else load_cache()
+    cached_posts = cache.get('posts', {}) if cache.get('deps') == parse_deps else {}
+    new_cached_posts = {}
+    # Source files behind each daily page, so removing a post from a day also rebuilds it
+    cached_pages = cache.get('pages', {})
+    new_cached_pages = {}
+    # Hashes of the index and tag pages as last written, see write_if_changed()
+    hashes = cache.get('hashes', {})
+    # Post lists the tag pages were last rendered from, only valid for the same templates
+    tag_sigs = cache.get('tag_sigs', {}) if cache.get('global_mtime') == global_mtime else {}
+    to_parse = []
+
+    entries = _scan_posts()
+
+    # Reuse cached posts, then parse the rest in parallel
+    stats = {}
+    posts = {}
+    for entry in entries:
+        filepath = entry.path
+        st = entry.stat()
+        stats[filepath] = st
+        cached = cached_posts.get(filepath)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            posts[filepath] = cached[2]
+        else:
+            to_parse.append(filepath)
+    posts.update(zip(to_parse, parse_posts(to_parse, lookups=lookups)))
+
+    for entry in entries:
+        st = stats[entry.path]
+        post = posts[entry.path]
+        new_cached_posts[entry.path] = _cache_entry(st, post)
+        _add_post(posts_by_date, all_tags, entry.name, post, st.st_mtime)
+
+    # Nothing to render if no post changed or disappeared, the templates and build
+    # script are untouched and every page from the last build is still in place
+    if (not force and not to_parse
+            and set(new_cached_posts) == set(cached_posts)
+            and cache.get('global_mtime') == global_mtime
+            and 'outputs' in cache
+            and all(os.path.exists(output_prefix + f) for f in cache['outputs'])):
+        print(f"Site up to date in {OUTPUT_DIR}/")
+        return
+
+    env = _get_env()
+    index_template = env.get_template('index.html')
+    tags_template = env.get_template('tags.html')
+    tag_page_template = env.get_template('tag_page.html')
 
     # Render pages and prepare index
-    sorted_dates = sorted(posts_by_date.keys(), reverse=True)
     index_posts = []
     
     generated_files = set()
+    page_jobs = []  # (output_path, template context) of daily pages to render
 
-    for date in sorted_dates:
+    for date in sorted(posts_by_date, reverse=True):
         group = posts_by_date[date]
-        output_path = os.path.join(OUTPUT_DIR, group['url'])
+        output_path = output_prefix + group['url']
         generated_files.add(group['url'])
         
-        # Sort entries: Tech last, then by timestamp
-        group['entries'].sort(key=lambda x: (x['is_tech'], x['sort_key'], x['filename']))
-        
-        # Collect images for index (first one)
-        first_image = next((e['image'] for e in group['entries'] if e['image']), '')
-        
-        index_posts.append({
-            'title': group['title'],
-            'date': group['date'],
-            'url': group['url'],
-            'image': first_image,
-            'is_future': group['has_future']
-        })
+        index_posts.append(_index_entry(group))
         
+        sources = [e['filename'] for e in group['entries']]
+        new_cached_pages[group['url']] = sources
+
         # Incremental check
         needs_rebuild = True
-        if not force and os.path.exists(output_path):
+        if not force and os.path.exists(output_path) and cached_pages.get(group['url']) == sources:
             output_mtime = os.stat(output_path).st_mtime
-            # If output is newer than both global deps and source content -> skip
-            if output_mtime > global_mtime and output_mtime > group['max_mtime']:
+            # If output is newer than global deps and every source file -> skip
+            if output_mtime > max(global_mtime, group['max_mtime']):
                 needs_rebuild = False
         
         if needs_rebuild:
-            # Render daily page
-            output_html = post_template.render(
-                title=group['title'],
-                date=group['date'],
-                entries=group['entries'],
-                has_future=group['has_future'],
-                build_time=build_time
-            )
-            
-            with open(output_path, 'w') as f:
-                f.write(output_html)
-            print(f"Built {group['url']}")
+            page_jobs.append(_page_job(group, output_path, build_time))
         else:
             # print(f"Skipped {group['url']} (up to date)")
             pass
 
+    render_pages(page_jobs)
+    for output_path, context in page_jobs:
+        print(f"Built {os.path.basename(output_path)}")
+
     # Render index (Conditionally write if content changed)
     index_html = index_template.render(posts=index_posts, build_time=build_time)
-    index_path = os.path.join(OUTPUT_DIR, 'index.html')
+    index_path = output_prefix + 'index.html'
     
-    write_if_changed(index_path, index_html, force)
+    write_if_changed(index_path, index_html, force, hashes)
     generated_files.add('index.html')
 
     # Generate Tags Index
     tags_list = sorted(all_tags.values(), key=lambda x: x['name'].lower())
     tags_html = tags_template.render(tags=tags_list, build_time=build_time)
-    tags_path = os.path.join(OUTPUT_DIR, 'tags.html')
+    tags_path = output_prefix + 'tags.html'
     
-    write_if_changed(tags_path, tags_html, force)
+    write_if_changed(tags_path, tags_html, force, hashes)
     generated_files.add('tags.html')
 
     # Generate Individual Tag Pages
-    for slug, data in all_tags.items():
-        tag_filename = f"tag_{slug}.html"
-        tag_path = os.path.join(OUTPUT_DIR, tag_filename)
-        # Sort posts by date descending
-        sorted_posts = sorted(data['posts'], key=lambda x: x['date'], reverse=True)
-        
-        tag_page_html = tag_page_template.render(
-            tag_name=data['name'],
-            posts=sorted_posts,
-            build_time=build_time
-        )
-        
-        write_if_changed(tag_path, tag_page_html, force)
-        generated_files.add(tag_filename)
+    for data in all_tags.values():
+        generated_files.add(_write_tag_page(tag_page_template, data, output_prefix, build_time, force, hashes, tag_sigs))
 
     # Cleanup stale files
-    for f in os.listdir(OUTPUT_DIR):
-        if f.endswith('.html') and f not in generated_files:
-            print(f"Removing stale file: {f}")
-            os.remove(os.path.join(OUTPUT_DIR, f))
+    with os.scandir(OUTPUT_DIR) as it:
+        stale = [e for e in it if e.name.endswith('.html') and e.name not in generated_files]
+    for e in stale:
+        print(f"Removing stale file: {e.name}")
+        os.remove(e.path)
         
+    # Only files seen in this build are kept, so deleted posts drop out
+    save_cache({
+        'deps': parse_deps,
+        'posts': new_cached_posts,
+        'pages': new_cached_pages,
+        'hashes': {p: h for p, h in hashes.items() if p[len(output_prefix):] in generated_files},
+        'tag_sigs': {slug: sig for slug, sig in tag_sigs.items() if slug in all_tags},
+        'global_mtime': global_mtime,
+        'outputs': sorted(generated_files)
+    })
+
+    print(f"Site built in {OUTPUT_DIR}/")
+
+def build_post(filepath):
+    """
+    Updates the site for a single new or edited post in CONTENT_DIR. Only that post
+    is parsed, and only its daily page, the index, the tags index and the pages of
+    its tags are rendered; everything else comes from the cache of the last build.
+    Falls back to a full build() if anything besides this post changed since then.
+    """
+    cache = load_cache()
+    global_mtime = _global_mtime()
+    if (cache.get('deps') != _parse_deps()
+            or cache.get('global_mtime') != global_mtime
+            or 'outputs' not in cache):
+        return build()
+
+    output_prefix = OUTPUT_DIR + os.sep
+    filepath = os.path.join(CONTENT_DIR, os.path.basename(filepath))
+    cached_posts = cache['posts']
+    entries = _scan_posts()
+    for entry in entries:
+        if entry.path == filepath:
+            continue
+        st = entry.stat()
+        cached = cached_posts.get(entry.path)
+        if not cached or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+            return build()
+    if len(entries) != len(set(cached_posts) | {filepath}):
+        return build()
+
+    old = cached_posts.get(filepath)
+    post = parse_post(filepath, lookups=load_lookups())
+    cached_posts[filepath] = _cache_entry(os.stat(filepath), post)
+
+    # Mirror the post's image if the static sync has not picked it up yet
+    image = post['metadata'].get('image')
+    if image and os.path.isfile(image):
+        dest_image = os.path.join(OUTPUT_DIR, image)
+        if not os.path.exists(dest_image) or os.stat(image).st_mtime > os.stat(dest_image).st_mtime:
+            os.makedirs(os.path.dirname(dest_image), exist_ok=True)
+            link_or_copy(image, dest_image)
+
+    posts_by_date = {}
+    all_tags = {}
+    for path, (mtime_ns, size, cached_post) in cached_posts.items():
+        p = post if path == filepath else cached_post
+        _add_post(posts_by_date, all_tags, os.path.basename(path), p, mtime_ns / 1e9)
+
+    # The post's day and tags, plus the ones it had before an edit
+    dates = {post['metadata'].get('date')}
+    slugs = {tag['slug'] for tag in post['tags']}
+    if old:
+        dates.add(old[2]['metadata'].get('date'))
+        slugs.update(tag['slug'] for tag in old[2]['tags'])
+
+    build_time = datetime.now(timezone.utc).strftime('%Y/%m/%d %H:%M:%S UTC')
+    env = _get_env()
+    outputs = set(cache['outputs'])
+    pages = cache.get('pages', {})
+    hashes = cache.get('hashes', {})
+    tag_sigs = cache.get('tag_sigs', {})
+
+    index_posts = [_index_entry(posts_by_date[date]) for date in sorted(posts_by_date, reverse=True)]
+    for date in dates:
+        url = f"{date}.html"
+        if date in posts_by_date:
+            group = posts_by_date[date]
+            _render_page(_page_job(group, output_prefix + url, build_time))
+            print(f"Built {url}")
+            pages[url] = [e['filename'] for e in group['entries']]
+            outputs.add(url)
+        elif url in outputs:
+            print(f"Removing stale file: {url}")
+            os.remove(output_prefix + url)
+            pages.pop(url, None)
+            outputs.discard(url)
+
+    index_html = env.get_template('index.html').render(posts=index_posts, build_time=build_time)
+    write_if_changed(output_prefix + 'index.html', index_html, hashes=hashes)
+
+    tags_list = sorted(all_tags.values(), key=lambda x: x['name'].lower())
+    tags_html = env.get_template('tags.html').render(tags=tags_list, build_time=build_time)
+    write_if_changed(output_prefix + 'tags.html', tags_html, hashes=hashes)
+
+    tag_page_template = env.get_template('tag_page.html')
+    for slug in slugs:
+        tag_filename = f"tag_{slug}.html"
+        if slug in all_tags:
+            outputs.add(_write_tag_page(tag_page_template, all_tags[slug], output_prefix, build_time, False, hashes, tag_sigs))
+        elif tag_filename in outputs:
+            print(f"Removing stale file: {tag_filename}")
+            os.remove(output_prefix + tag_filename)
+            hashes.pop(output_prefix + tag_filename, None)
+            tag_sigs.pop(slug, None)
+            outputs.discard(tag_filename)
+
+    cache.update({
+        'posts': cached_posts,
+        'pages': pages,
+        'hashes': hashes,
+        'tag_sigs': tag_sigs,
+        'outputs': sorted(outputs)
+    })
+    save_cache(cache)
+
     print(f"Site built in {OUTPUT_DIR}/")
 
 if __name__ == "__main__":
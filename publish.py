@@ -6,19 +6,106 @@ import datetime
 import math
 import re
 import time
-import requests
 import argparse
-from google import genai
-from google.genai import errors
-from PIL import Image
-import build
-import ephem
+import functools
+import mimetypes
+import json
+import sqlite3
+import threading
+import io
+import hashlib
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from zoneinfo import ZoneInfo
+# google.genai, requests, PIL, ephem, timezonefinder and build are imported where
+# they are used, so --list-models doesn't pay for loading them
 
 # Default Coordinates (Kitchener, ON, Canada)
 DEFAULT_LAT = '43.4254'
 DEFAULT_LON = '-80.5112'
 DEFAULT_ELEVATION = 300 # Approx for Kitchener
 DEFAULT_LOCATION_NAME = "Kitchener, ON, Canada"
+DEFAULT_TIMEZONE = "America/Toronto"
+
+# Precompiled patterns for the transcription pipeline
+# Server-suggested delay in a 429 error message
+_RETRY_DELAY_RE = re.compile(r'retry in (\d+(\.\d+)?)s')
+# Start of a [[ YYYY/MM/DD ... ]] timestamp anywhere in a line, after an optional prefix/bullet
+# Also support space delimiters in date YYYY MM DD
+_TS_START_RE = re.compile(r'\[\[\s*(\d{4})[/ ](\d{2})[/ ](\d{2})')
+# The same, for searching a whole text; whitespace after [[ may not span lines
+_TS_START_TEXT_RE = re.compile(r'\[\[[^\S\n]*(\d{4})[/ ](\d{2})[/ ](\d{2})')
+_DATETIME_RE = re.compile(r'(\d{4})/(\d{2})/(\d{2})\s+(\d{2}):(\d{2}):(\d{2})')
+# First timestamp date in the transcription
+_FIRST_TS_RE = re.compile(r'\[\[\s*(\d{4})/(\d{2})/(\d{2})')
+
+# One pooled session for all Open-Meteo calls, so TLS connections are reused;
+# rate limits and server errors are retried with backoff
+HTTP_TIMEOUT = 10
+_session = None
+_session_lock = threading.Lock()
+
+def http_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+            ))
+            _session.headers["User-Agent"] = "quareia-publish (+https://jcdietrich.github.io/quareia/)"
+        return _session
+
+# Geocoding results, past days' weather and image transcriptions never change, so they are kept between runs
+LOOKUP_CACHE_FILE = os.path.expanduser("~/.quareia_cache.db")
+# Weather this many days old or newer may still be revised by Open-Meteo
+WEATHER_SETTLE_DAYS = 2
+
+_lookup_cache = None
+_lookup_cache_lock = threading.Lock()
+
+def cache_get(key):
+    """
+    Returns the cached value for key (a tuple), or None.
+    A missing or broken cache file only means lookups go to the network.
+    """
+    global _lookup_cache
+    with _lookup_cache_lock:
+        try:
+            if _lookup_cache is None:
+                _lookup_cache = sqlite3.connect(LOOKUP_CACHE_FILE, check_same_thread=False)
+                _lookup_cache.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v TEXT)")
+            row = _lookup_cache.execute("SELECT v FROM kv WHERE k = ?", (json.dumps(key),)).fetchone()
+        except sqlite3.Error:
+            return None
+    return json.loads(row[0]) if row else None
+
+def cache_put(key, value):
+    with _lookup_cache_lock:
+        if _lookup_cache is None:
+            return
+        try:
+            with _lookup_cache:
+                _lookup_cache.execute("INSERT OR REPLACE INTO kv VALUES (?, ?)", (json.dumps(key), json.dumps(value)))
+        except sqlite3.Error:
+            pass
+
+# Prompts for the OCR and spell check calls
+OCR_PROMPT = "Transcribe the handwritten text in this image. This is a magickal journal entry. Rules: 1. Transcribe EXACTLY as written, including idiosyncratic spellings like 'candel', 'magick', 'sunrises'. 2. Format timestamps in double brackets with exactly one space after [[ and before ]], like this: [[ YYYY/MM/DD HH:MM:SS EST ]]. Pay close attention to the time digits. If you see a 'T' between the date and time, ignore it and use a space. 3. Do not add any conversational filler. 4. If you see text in double quotes like \"\"TITLE\"\", remove the quotes and place the TITLE text immediately before the timestamp on the same line, like: TITLE [[ YYYY/... ]]."
+SPELL_CHECK_PROMPT = (
+    "You are a spell checker for a transcription of a handwritten journal. "
+    "Your goal is to correct any clear spelling errors (like typos or missing letters) while preserving the original context. "
+    "If a word is spelled correctly, or if it is an intentional variant common in magickal journals (like 'magick'), leave it as is. "
+    "Provide the corrected text directly. Do NOT use any special notation like {{OriginalWord}} to highlight changes. "
+    "Preserve all formatting, including timestamps which MUST be in the format [[ YYYY/MM/DD HH:MM:SS TZ ]] (with exactly one space after [[ and before ]]) and any bullet points. "
+    "Do not add any conversational filler. Only output the corrected text."
+)
 
 DEFAULT_MODELS = [
     'gemini-3-pro', 'gemini-3-pro-preview', 
@@ -28,7 +115,38 @@ DEFAULT_MODELS = [
     'gemini-1.5-flash'
 ]
 
-def generate_content_with_retry(client, models, contents, retries=1, failed_models=None):
+# Models that answered 404 are skipped by later runs for this long, then probed again
+MISSING_MODEL_TTL = 7 * 24 * 3600
+# Models still rate limited after all retries are skipped until their quota window has likely reset
+EXHAUSTED_MODEL_TTL = 10 * 60
+
+def known_failed_models():
+    """
+    Returns the models that answered 404 within the last MISSING_MODEL_TTL seconds
+    or ran out of quota within the last EXHAUSTED_MODEL_TTL seconds.
+    """
+    now = time.time()
+    failed = set()
+    for kind, ttl in (("missing-models", MISSING_MODEL_TTL), ("exhausted-models", EXHAUSTED_MODEL_TTL)):
+        seen = cache_get((kind,)) or {}
+        failed.update(model for model, when in seen.items() if now - when < ttl)
+    return failed
+
+def _mark_failed_model(kind, model):
+    seen = cache_get((kind,)) or {}
+    seen[model] = time.time()
+    cache_put((kind,), seen)
+
+# What generate_content_with_retry returns for a streamed call
+StreamedResponse = collections.namedtuple('StreamedResponse', 'text')
+
+def generate_content_with_retry(client, models, contents, retries=1, failed_models=None, on_text=None):
+    """
+    Calls the first working model. With on_text, the response is streamed and
+    on_text gets each piece of text as it arrives; a retry starts over, so it
+    may see the beginning of the text again.
+    """
+    from google.genai import errors
     if isinstance(models, str):
         models = [models]
         
@@ -40,13 +158,20 @@ def generate_content_with_retry(client, models, contents, retries=1, failed_mode
         print(f"Trying model: {model}")
         for attempt in range(retries + 1):
             try:
-                return client.models.generate_content(model=model, contents=contents)
+                if on_text is None:
+                    return client.models.generate_content(model=model, contents=contents)
+                pieces = []
+                for chunk in client.models.generate_content_stream(model=model, contents=contents):
+                    if chunk.text:
+                        pieces.append(chunk.text)
+                        on_text(chunk.text)
+                return StreamedResponse("".join(pieces))
             except errors.ClientError as e:
                 if e.code == 429:
                     print(f"429 Resource Exhausted. Attempt {attempt + 1}/{retries + 1}")
                     delay = 60 # Default to 60s
                     
-                    match = re.search(r'retry in (\d+(\.\d+)?)s', str(e))
+                    match = _RETRY_DELAY_RE.search(str(e))
                     if match:
                         delay = float(match.group(1)) + 2
                     
@@ -55,6 +180,7 @@ def generate_content_with_retry(client, models, contents, retries=1, failed_mode
                     
                     if attempt == retries:
                         print(f"Max retries reached for model {model}.")
+                        _mark_failed_model("exhausted-models", model)
                         if failed_models is not None:
                             failed_models.add(model)
                         
@@ -65,6 +191,7 @@ def generate_content_with_retry(client, models, contents, retries=1, failed_mode
                             print("Switching to next model...")
                 elif e.code == 404:
                     print(f"Model {model} not found (404). Skipping to next model.")
+                    _mark_failed_model("missing-models", model)
                     if failed_models is not None:
                         failed_models.add(model)
                     break
@@ -79,6 +206,19 @@ def get_coordinates_from_name(place_name):
     Geocodes a place name to (lat, lon) using Open-Meteo.
     Returns (lat, lon) as strings, or None if not found.
     """
+    # Variants in case and spacing share one lookup, made once per run
+    key = " ".join(place_name.lower().split())
+    if key not in _geocode_memo:
+        _geocode_memo[key] = _geocode(place_name, key)
+    return _geocode_memo[key]
+
+_geocode_memo = {}
+
+def _geocode(place_name, key):
+    cached = cache_get(("geo", key))
+    if cached:
+        return tuple(cached)
+
     url = "https://geocoding-api.open-meteo.com/v1/search"
     # Simple heuristic: take first part of comma-separated string for search
     search_name = place_name.split(',')[0].strip()
@@ -90,71 +230,141 @@ def get_coordinates_from_name(place_name):
         "format": "json"
     }
     try:
-        response = requests.get(url, params=params)
+        response = http_session().get(url, params=params, timeout=HTTP_TIMEOUT)
         data = response.json()
         if "results" in data and len(data["results"]) > 0:
             result = data["results"][0]
-            return str(result["latitude"]), str(result["longitude"])
+            coords = str(result["latitude"]), str(result["longitude"])
+            cache_put(("geo", key), coords)
+            return coords
     except Exception as e:
         print(f"Error geocoding '{place_name}': {e}")
     
     return None
 
-def get_weather_condition(code):
-    # WMO Weather interpretation codes (WW)
-    codes = {
-        0: "Clear sky",
-        1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
-        45: "Fog", 48: "Depositing rime fog",
-        51: "Drizzle: Light", 53: "Drizzle: Moderate", 55: "Drizzle: Dense intensity",
-        56: "Freezing Drizzle: Light", 57: "Freezing Drizzle: Dense intensity",
-        61: "Rain: Slight", 63: "Rain: Moderate", 65: "Rain: Heavy intensity",
-        66: "Freezing Rain: Light", 67: "Freezing Rain: Heavy intensity",
-        71: "Snow fall: Slight", 73: "Snow fall: Moderate", 75: "Snow fall: Heavy intensity",
-        77: "Snow grains",
-        80: "Rain showers: Slight", 81: "Rain showers: Moderate", 82: "Rain showers: Violent",
-        85: "Snow showers slight", 86: "Snow showers heavy",
-        95: "Thunderstorm: Slight or moderate",
-        96: "Thunderstorm with slight hail", 99: "Thunderstorm with heavy hail"
-    }
-    return codes.get(code, "Unknown")
+# WMO Weather interpretation codes (WW)
+_WMO_CODES = MappingProxyType({
+    0: "Clear sky",
+    1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
+    45: "Fog", 48: "Depositing rime fog",
+    51: "Drizzle: Light", 53: "Drizzle: Moderate", 55: "Drizzle: Dense intensity",
+    56: "Freezing Drizzle: Light", 57: "Freezing Drizzle: Dense intensity",
+    61: "Rain: Slight", 63: "Rain: Moderate", 65: "Rain: Heavy intensity",
+    66: "Freezing Rain: Light", 67: "Freezing Rain: Heavy intensity",
+    71: "Snow fall: Slight", 73: "Snow fall: Moderate", 75: "Snow fall: Heavy intensity",
+    77: "Snow grains",
+    80: "Rain showers: Slight", 81: "Rain showers: Moderate", 82: "Rain showers: Violent",
+    85: "Snow showers slight", 86: "Snow showers heavy",
+    95: "Thunderstorm: Slight or moderate",
+    96: "Thunderstorm with slight hail", 99: "Thunderstorm with heavy hail"
+})
 
-def get_weather_data(dt, lat=DEFAULT_LAT, lon=DEFAULT_LON):
-    # dt should be a datetime object
-    date_str = dt.strftime("%Y-%m-%d")
-    
+# Every day fetched in this run, recent ones included; a page's timestamps share days
+_weather_memo = {}
+
+def _fetch_weather_range(lat, lon, start_date, end_date):
+    """
+    Fetches the hourly weather of start_date..end_date at one location with a single
+    Open-Meteo request. Returns {date_str: response for that day}, or {} if it failed.
+    """
     url = "https://api.open-meteo.com/v1/forecast"
     params = {
         "latitude": lat,
         "longitude": lon,
         "hourly": "temperature_2m,weather_code",
         "timezone": "auto", # Use auto to get local time based on coords ideally, or match logic
-        "start_date": date_str,
-        "end_date": date_str
+        "start_date": start_date,
+        "end_date": end_date
     }
     
     # Note: timezone 'auto' tries to resolve timezone from coordinates. 
     # Since we are passing diverse coords, this is safer than hardcoding America/New_York.
     
     try:
-        response = requests.get(url, params=params)
+        response = http_session().get(url, params=params, timeout=HTTP_TIMEOUT)
         data = response.json()
-        
-        if "hourly" not in data:
-            return "N/A", "N/A"
-            
+        hourly = data["hourly"]
+        # Split the range back into per-day responses, keyed on the date part of each hour
+        days = {}
+        for i, t in enumerate(hourly["time"]):
+            day = days.setdefault(t[:10], {"time": [], "temperature_2m": [], "weather_code": []})
+            day["time"].append(t)
+            day["temperature_2m"].append(hourly["temperature_2m"][i])
+            day["weather_code"].append(hourly["weather_code"][i])
+    except Exception as e:
+        print(f"Error fetching weather: {e}")
+        return {}
+    return {date_str: dict(data, hourly=day) for date_str, day in days.items()}
+
+def get_weather_batch(lat, lon, dates):
+    """
+    Fetches the hourly weather of several days (YYYY-MM-DD) at one location, with one
+    Open-Meteo request per run of consecutive days.
+    Returns {date_str: response for that day}; days that failed are left out.
+    """
+    result = {}
+    missing = []
+    for date_str in set(dates):
+        cached = _weather_memo.get((lat, lon, date_str)) or cache_get(("wx", lat, lon, date_str))
+        if cached:
+            result[date_str] = cached
+        else:
+            missing.append(date_str)
+    if not missing:
+        return result
+
+    # Runs of consecutive days, so a stray date (say a misread year) neither widens
+    # the range nor fails the request for the other days
+    runs = []
+    for date_str in sorted(missing):
+        if runs and datetime.date.fromisoformat(date_str) - datetime.date.fromisoformat(runs[-1][-1]) == datetime.timedelta(days=1):
+            runs[-1].append(date_str)
+        else:
+            runs.append([date_str])
+
+    fetched = {}
+    for run in runs:
+        days = _fetch_weather_range(lat, lon, run[0], run[-1])
+        if len(run) > 1 and any(date_str not in days for date_str in run):
+            # The ranged request failed or left days out; those days are asked for one by one
+            for date_str in run:
+                if date_str not in days:
+                    days.update(_fetch_weather_range(lat, lon, date_str, date_str))
+        fetched.update(days)
+
+    # Only settled days are cached; recent ones may still change
+    settled = (datetime.date.today() - datetime.timedelta(days=WEATHER_SETTLE_DAYS)).isoformat()
+    for date_str in missing:
+        if date_str in fetched:
+            result[date_str] = _weather_memo[(lat, lon, date_str)] = fetched[date_str]
+            if date_str < settled:
+                cache_put(("wx", lat, lon, date_str), result[date_str])
+    return result
+
+def fetch_hourly_weather(date_str, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Fetches the hourly weather of one day (YYYY-MM-DD) at a location from Open-Meteo.
+    Returns the decoded response, or None if the request failed.
+    """
+    return get_weather_batch(lat, lon, [date_str]).get(date_str)
+
+def weather_at_hour(data, hour):
+    """
+    Picks (temperature, condition) for an hour out of a fetch_hourly_weather() response.
+    """
+    if not data or "hourly" not in data:
+        return "N/A", "N/A"
+
+    try:
         # The hourly data array corresponds to local time 00:00 to 23:00 if timezone is set correctly.
         # However, we have 'dt' which is presumably in the *local time of the user/journal*.
         # Let's assume the API returns data in local time of the requested location.
-        
-        target_hour = dt.hour
-        
-        idx = target_hour
+        idx = hour
         if 0 <= idx < len(data['hourly']['time']):
             temp = data['hourly']['temperature_2m'][idx]
             code = data['hourly']['weather_code'][idx]
             
-            condition = get_weather_condition(code)
+            condition = _WMO_CODES.get(code, "Unknown")
             return f"{temp}°C", condition
         
     except Exception as e:
@@ -162,14 +372,188 @@ def get_weather_data(dt, lat=DEFAULT_LAT, lon=DEFAULT_LON):
     
     return "N/A", "N/A"
 
+def get_weather_data(dt, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    # dt should be a datetime object
+    return weather_at_hour(fetch_hourly_weather(dt.strftime("%Y-%m-%d"), lat, lon), dt.hour)
+
+def _location_value(text):
+    """
+    Returns the place of a '* Location: ...' style line, or None for other lines.
+    """
+    text = text.strip()
+    if text.startswith(('* Location:', '- Location:', '• Location:')):
+        return text.split(':', 1)[1].strip() or None
+    return None
+
+# A block's first line, split once when the transcription is cut into blocks
+BlockHeader = collections.namedtuple('BlockHeader', 'prefix ts_full trailing date_groups dt_match')
+
+def block_header(first_line, match):
+    """
+    Splits a (stripped) first line, where match is its _TS_START_RE match, into
+    the parts around the [[ ... ]] timestamp. None if the timestamp never closes.
+    """
+    # The timestamp runs from its '[[' to the first ']]' after the date
+    close = first_line.find(']]', match.end())
+    if close == -1:
+        return None
+    ts_full = first_line[match.start():close + 2]
+    return BlockHeader(first_line[:match.start()], ts_full, first_line[close + 2:].strip(),
+                       match.groups(), _DATETIME_RE.search(ts_full))
+
+def split_blocks(text):
+    """
+    Cuts a transcription into blocks that each start at a timestamp line.
+    Returns a list of (BlockHeader or None, lines).
+    """
+    # One regex pass over the whole text finds the timestamp lines
+    blocks = []
+    header = None
+    block_start = 0
+    line_start = -1
+    for match in _TS_START_TEXT_RE.finditer(text):
+        if match.start() < line_start:
+            continue  # Another timestamp on a line that already starts a block
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        line_end = text.find('\n', match.end())
+        if line_end == -1:
+            line_end = len(text)
+        if line_start > block_start:
+            blocks.append((header, text[block_start:line_start - 1].split('\n')))
+            block_start = line_start
+        # Same positions as in the stripped line, less its leading whitespace
+        lead = len(text[line_start:match.start()]) - len(text[line_start:match.start()].lstrip())
+        first_line = text[line_start + lead:line_end].rstrip()
+        header = block_header(first_line, _TS_START_RE.match(first_line, match.start() - line_start - lead))
+        line_start = line_end
+    blocks.append((header, text[block_start:].split('\n')))
+    return blocks
+
+def previous_weather(post_path):
+    """
+    Reads the weather an earlier run wrote into post_path, so republishing the same
+    page doesn't fetch it again. Returns {(ts_full, location): (temperature, condition)}.
+    """
+    try:
+        with open(post_path, 'r', encoding='utf-8') as f:
+            parts = f.read().split('---', 2)
+    except FileNotFoundError:
+        return {}
+    if len(parts) < 3:
+        return {}
+
+    keys = ('* Location:', '* Temperature:', '* Weather Condition:')
+    weather = {}
+    for header, block_lines in split_blocks(parts[2]):
+        if header is None:
+            continue
+        values = {}
+        for line in block_lines[1:]:
+            line = line.strip()
+            for key in keys:
+                if line.startswith(key):
+                    values.setdefault(key, line[len(key):].strip())
+        if len(values) == len(keys) and values['* Temperature:'] != "N/A":
+            weather[(header.ts_full, values['* Location:'])] = (values['* Temperature:'], values['* Weather Condition:'])
+    return weather
+
+def prefetch_block_lookups(blocks, geocoding=None, known_weather=None):
+    """
+    Geocodes the location overrides and fetches the weather of every timestamp block
+    (one batched request per location) concurrently, instead of one request after
+    another while the blocks are written.
+    blocks are split_blocks() results; geocoding maps place names to lookups
+    already started (futures); blocks found in known_weather (previous_weather())
+    need no weather.
+    Returns (coords by place name, hourly weather by (lat, lon, date_str)).
+    """
+    geocoding = geocoding or {}
+    known_weather = known_weather or {}
+    headers = []
+    for header, block_lines in blocks:
+        if header is None:
+            continue
+        names = [n for n in map(_location_value, [header.trailing] + block_lines[1:]) if n]
+        # The block is labelled with its last location, as in flush_block
+        if (header.ts_full, names[-1] if names else DEFAULT_LOCATION_NAME) in known_weather:
+            headers.append((None, names))
+        else:
+            headers.append((header.dt_match, names))
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        names = list({n for _, block_names in headers for n in block_names})
+        coords = dict(zip(names, ex.map(
+            lambda n: geocoding[n].result() if n in geocoding else get_coordinates_from_name(n), names)))
+
+        # The last location in a block that geocodes wins, as in flush_block
+        days = set()
+        for dt_match, block_names in headers:
+            if not dt_match:
+                continue
+            lat, lon = DEFAULT_LAT, DEFAULT_LON
+            for n in block_names:
+                if coords[n]:
+                    lat, lon = coords[n]
+            try:
+                y, m, d = map(int, dt_match.groups()[:3])
+                days.add((lat, lon, datetime.date(y, m, d).isoformat()))
+            except ValueError:
+                pass
+        # One request per location, covering all of its days
+        by_location = {}
+        for lat, lon, date_str in days:
+            by_location.setdefault((lat, lon), []).append(date_str)
+        weather = {}
+        for (lat, lon), batch in zip(by_location, ex.map(lambda loc: get_weather_batch(*loc, by_location[loc]), by_location)):
+            for date_str in by_location[(lat, lon)]:
+                weather[(lat, lon, date_str)] = batch.get(date_str)
+
+    return coords, weather
+
+# Astro times are shown in the local time of the location, see get_astro_data
+_UTC = datetime.timezone.utc
+_tz_finder = None
+
+@functools.lru_cache(maxsize=None)
+def _tz_for(lat, lon):
+    """
+    Returns the ZoneInfo of a location, or DEFAULT_TIMEZONE when it can't be
+    looked up (timezonefinder not installed, or a point out at sea).
+    """
+    global _tz_finder
+    tz_name = None
+    if _tz_finder is None:
+        try:
+            from timezonefinder import TimezoneFinder
+        except ImportError:
+            _tz_finder = False
+        else:
+            # Loads its lookup tables, so only once
+            _tz_finder = TimezoneFinder()
+    if _tz_finder:
+        tz_name = _tz_finder.timezone_at(lat=lat, lng=lon)
+    return ZoneInfo(tz_name or DEFAULT_TIMEZONE)
+
+def _to_local_str(ephem_date, tz):
+    """
+    Formats an ephem date as the time of day in tz, or "N/A".
+    """
+    if not ephem_date:
+        return "N/A"
+    dt_local = ephem_date.datetime().replace(tzinfo=_UTC).astimezone(tz)
+    return dt_local.strftime("%H:%M:%S")
+
+@functools.lru_cache(maxsize=512)
 def get_astro_data(date_str, lat=DEFAULT_LAT, lon=DEFAULT_LON):
     """
     Calculates astronomical data for the given date and location.
-    Returns a formatted markdown string.
+    Returns a formatted markdown string. Results are memoized, since every
+    timestamp on the same day asks for the same data.
     """
+    import ephem
     try:
-        # Parse date
-        d = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        # Parse date (callers pass date.isoformat() strings)
+        d = datetime.date.fromisoformat(date_str)
         
         # Observer setup
         obs = ephem.Observer()
@@ -177,50 +561,23 @@ def get_astro_data(date_str, lat=DEFAULT_LAT, lon=DEFAULT_LON):
         obs.lon = lon
         obs.elevation = DEFAULT_ELEVATION
         
-        # Determine UTC offset.
-        # This is tricky without a timezone library like pytz or timezonefinder.
-        # For now, we will stick to the hardcoded -5 (EST) approach for consistency with previous logic,
-        # OR we could try to be smarter. 
-        # Given the constraints and the journal nature (person likely in EST/EDT zone usually),
-        # sticking to -5 is a safe fallback if we don't want to add heavy deps.
-        # However, if location changes to say "London", -5 is wrong.
-        # But `ephem` calculations for rise/set are done in UTC, and we convert to local.
-        # If we don't know the local timezone offset of the arbitrary location, 
-        # showing "Local Time" is hard.
-        # For this iteration, let's keep assuming the user is documenting in their "Home" timezone (EST)
-        # unless we want to over-engineer the timezone lookup.
-        
-        utc_offset = datetime.timedelta(hours=-5)
-        
-        # Start of day in UTC (approx, based on offset)
-        start_local = datetime.datetime.combine(d, datetime.time(0, 0, 0))
-        start_utc = start_local - utc_offset
+        # Local midnight of the location, in UTC for ephem (DST aware)
+        tz = _tz_for(float(lat), float(lon))
+        start_local = datetime.datetime.combine(d, datetime.time(0, 0, 0), tzinfo=tz)
+        start_utc = start_local.astimezone(_UTC).replace(tzinfo=None)
         
         obs.date = start_utc
         
         sun = ephem.Sun()
         moon = ephem.Moon()
-        
-        def to_local_time_str(ephem_date):
-            if not ephem_date: return "N/A"
-            dt_utc = set_utc(ephem_date.datetime())
-            dt_local = dt_utc + utc_offset
-            # Check if it's still on the same local day
-            if dt_local.date() != d:
-                # It might be, or next day. Just return time.
-                pass
-            return dt_local.strftime("%H:%M:%S")
-
-        def set_utc(dt):
-            return dt.replace(tzinfo=datetime.timezone.utc)
 
         # Sun
-        sun_rise = to_local_time_str(obs.next_rising(sun))
-        sun_set = to_local_time_str(obs.next_setting(sun))
+        sun_rise = _to_local_str(obs.next_rising(sun), tz)
+        sun_set = _to_local_str(obs.next_setting(sun), tz)
         
         # Moon
-        moon_rise = to_local_time_str(obs.next_rising(moon))
-        moon_set = to_local_time_str(obs.next_setting(moon))
+        moon_rise = _to_local_str(obs.next_rising(moon), tz)
+        moon_set = _to_local_str(obs.next_setting(moon), tz)
         
         # Moon Phase at noon
         obs.date = start_utc + datetime.timedelta(hours=12)
@@ -239,47 +596,175 @@ def get_astro_data(date_str, lat=DEFAULT_LAT, lon=DEFAULT_LON):
         print(f"Error calculating astro data: {e}")
         return ""
 
-def optimize_image(source_path, dest_dir, filename_base):
+def copy_file(source_path, dest_path):
     """
-    Optimizes image: converts to WebP, resizes to max width 1600px.
-    Returns the new filename.
+    Copies file contents inside the kernel with copy_file_range where available
+    (a reflink on CoW filesystems), otherwise with shutil.copyfile.
     """
     try:
-        with Image.open(source_path) as img:
-            # Fix orientation based on EXIF
-            from PIL import ImageOps
-            img = ImageOps.exif_transpose(img)
+        with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            if remaining == 0:
+                return
+    except (AttributeError, OSError):
+        pass
+    shutil.copyfile(source_path, dest_path)
 
-            if img.mode in ('RGBA', 'P'):
-                img = img.convert('RGB')
-            
-            max_width = 1600
-            if img.width > max_width:
-                ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-
-            new_filename = f"{filename_base}.webp"
-            dest_path = os.path.join(dest_dir, new_filename)
-            
-            img.save(dest_path, "WEBP", quality=80)
-            print(f"Image optimized and saved to {dest_path}")
-            return new_filename
+# Width of the site copy of an image
+WEBP_MAX_WIDTH = 1600
+
+def load_image(source, min_width=None):
+    """
+    Opens and decodes an image (path or file object), turned upright per its
+    EXIF orientation. With min_width, a JPEG may be decoded at a reduced
+    scale that still leaves it at least that wide.
+    """
+    from PIL import Image, ImageOps
+    with Image.open(source) as img:
+        if min_width and img.format == 'JPEG':
+            # libjpeg decodes at 1/2, 1/4 or 1/8 scale directly, far cheaper than
+            # decoding every pixel only to resize them away. Orientations 5-8 swap the axes.
+            rotated = img.getexif().get(0x0112) in (5, 6, 7, 8)
+            img.draft(img.mode, (1, min_width) if rotated else (min_width, 1))
+        return ImageOps.exif_transpose(img)
+
+def encode_webp(source):
+    """
+    Converts an image (a load_image() result, path or file object) to WebP,
+    resized to max width 1600px. Returns the encoded bytes.
+    """
+    from PIL import Image
+    img = source if isinstance(source, Image.Image) else load_image(source, WEBP_MAX_WIDTH)
+
+    if img.mode in ('RGBA', 'P'):
+        img = img.convert('RGB')
+    
+    max_width = WEBP_MAX_WIDTH
+    if img.width > max_width:
+        ratio = max_width / img.width
+        new_height = int(img.height * ratio)
+        img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+
+    buf = io.BytesIO()
+    img.save(buf, "WEBP", quality=80)
+    return buf.getvalue()
+
+def image_digest(data):
+    """
+    Returns the content hash of an image file's bytes.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _made_from(dest_path, digest):
+    # The lookup cache records which source content each output was made from;
+    # a same-named output from another photo doesn't match
+    return os.path.exists(dest_path) and cache_get(("image", dest_path)) == digest
+
+def optimize_image(source_path, dest_dir, filename_base, data=None, webp_future=None, digest=None):
+    """
+    Optimizes image: converts to WebP, resizes to max width 1600px.
+    Returns the new filename. An existing result made from the same image
+    content is kept as is, so republishing the same image is cheap.
+    data is the source file's content if the caller already read it,
+    webp_future an encode_webp() already running for it, and digest its image_digest().
+    """
+    if digest is None:
+        if data is None:
+            with open(source_path, 'rb') as f:
+                data = f.read()
+        digest = image_digest(data)
+
+    new_filename = f"{filename_base}.webp"
+    dest_path = os.path.join(dest_dir, new_filename)
+    if _made_from(dest_path, digest):
+        print(f"Image already optimized at {dest_path}")
+        return new_filename
+
+    try:
+        if webp_future is not None:
+            webp = webp_future.result()
+        else:
+            webp = encode_webp(io.BytesIO(data) if data is not None else source_path)
+        with open(dest_path, 'wb') as f:
+            f.write(webp)
+        cache_put(("image", dest_path), digest)
+        print(f"Image optimized and saved to {dest_path}")
+        return new_filename
     except Exception as e:
         print(f"Error optimizing image: {e}. Falling back to copy.")
         base, ext = os.path.splitext(source_path)
         new_filename = f"{filename_base}{ext}"
         dest_path = os.path.join(dest_dir, new_filename)
-        shutil.copy2(source_path, dest_path)
+        if not _made_from(dest_path, digest):
+            # No need for metadata
+            copy_file(source_path, dest_path)
+            cache_put(("image", dest_path), digest)
         return new_filename
 
+# Gemini bills images per 768px tile; handwriting stays legible well below phone camera sizes
+OCR_MAX_EDGE = 1536
+
+def ocr_image_part(data, mime_type, image=None):
+    """
+    Returns the image bytes as a Gemini Part, downscaled to OCR_MAX_EDGE on the
+    longest side first if it is larger. Small images are sent as is.
+    image is the load_image() result for data, if the caller already decoded it.
+    """
+    from PIL import Image
+    from google.genai import types
+    try:
+        if image is None:
+            # Only the header is read here; large images are decoded below
+            with Image.open(io.BytesIO(data)) as probe:
+                if max(probe.size) > OCR_MAX_EDGE:
+                    image = load_image(io.BytesIO(data))
+        if image is not None and max(image.size) > OCR_MAX_EDGE:
+            # Orientation is lost with the EXIF data on re-encoding, so the image is upright first.
+            # convert() and copy() leave image untouched for other users; thumbnail() works in place.
+            img = image.convert('RGB') if image.mode != 'RGB' else image.copy()
+            img.thumbnail((OCR_MAX_EDGE, OCR_MAX_EDGE), Image.Resampling.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=90)
+            data, mime_type = buf.getvalue(), 'image/jpeg'
+    except Exception as e:
+        print(f"Error downscaling image for OCR: {e}. Sending it as is.")
+    return types.Part.from_bytes(data=data, mime_type=mime_type)
+
+def transcription_cache_keys(digest, models):
+    """
+    Returns the lookup cache keys of an image's OCR and of its spell-checked
+    transcription, for the image_digest() of the image. They cover the prompts
+    and models too, so changing either asks Gemini again.
+    """
+    ocr_key = ("ocr", digest, hashlib.blake2b(OCR_PROMPT.encode(), digest_size=8).hexdigest(), list(models))
+    checked_key = ("ocr-checked", digest,
+                   hashlib.blake2b((OCR_PROMPT + SPELL_CHECK_PROMPT).encode(), digest_size=8).hexdigest(), list(models))
+    return ocr_key, checked_key
+
 def process_image(image_path, models=None, failed_models=None):
     if models is None:
         models = DEFAULT_MODELS
         
     print(f"Processing {image_path}...")
+
+    # Don't spend a round-trip on models that recently answered 404 or ran out of quota,
+    # unless that is all of them
+    if failed_models is None:
+        failed_models = set()
+    recent = known_failed_models()
+    if not set(models) <= recent:
+        failed_models |= recent
     
-    if not os.path.exists(image_path):
+    # Read once; the same bytes go to Gemini and to optimize_image
+    try:
+        with open(image_path, 'rb') as f:
+            image_data = f.read()
+    except FileNotFoundError:
         print(f"Error: File {image_path} not found.")
         return
 
@@ -311,48 +796,88 @@ def process_image(image_path, models=None, failed_models=None):
     # 2. Perform OCR with Gemini
     print("Initializing Gemini (google-genai) for OCR...")
     
+    # Decoded once for both the OCR upload and the WebP copy; at least as wide as the
+    # WebP copy, which also covers OCR_MAX_EDGE
     try:
-        client = genai.Client(api_key=api_key)
-        
-        print("Reading text from image...")
-        img = Image.open(image_path)
-        
-        response = generate_content_with_retry(
-            client=client,
-            models=models,
-            contents=[
-                "Transcribe the handwritten text in this image. This is a magickal journal entry. Rules: 1. Transcribe EXACTLY as written, including idiosyncratic spellings like 'candel', 'magick', 'sunrises'. 2. Format timestamps in double brackets with exactly one space after [[ and before ]], like this: [[ YYYY/MM/DD HH:MM:SS EST ]]. Pay close attention to the time digits. If you see a 'T' between the date and time, ignore it and use a space. 3. Do not add any conversational filler. 4. If you see text in double quotes like \"\"TITLE\"\", remove the quotes and place the TITLE text immediately before the timestamp on the same line, like: TITLE [[ YYYY/... ]].", 
-                img
-            ],
-            failed_models=failed_models
-        )
-        transcribed_text = response.text.strip()
+        image = load_image(io.BytesIO(image_data), WEBP_MAX_WIDTH)
+    except Exception:
+        image = None
+
+    # The WebP conversion only needs the pixels, not the date from the transcription,
+    # so it runs in the background while Gemini reads the text
+    encode_pool = ThreadPoolExecutor(max_workers=1)
+    webp_future = encode_pool.submit(encode_webp, image if image is not None else io.BytesIO(image_data))
+    encode_pool.shutdown(wait=False)
+
+    # Re-running on the same image (e.g. while debugging the steps below) reuses the transcription
+    digest = image_digest(image_data)
+    ocr_key, checked_key = transcription_cache_keys(digest, models)
+    transcribed_text = cache_get(checked_key)
+
+    # The transcription is streamed; location overrides are geocoded as soon as their
+    # line is complete, so those lookups overlap with the rest of the generation
+    geocoding = {}
+    geo_pool = ThreadPoolExecutor(max_workers=4)
+    pending_line = [""]
+
+    def scan_text(text):
+        lines = (pending_line[0] + text).split('\n')
+        pending_line[0] = lines.pop()
+        for line in lines:
+            name = _location_value(line)
+            if not name and ']]' in line:
+                name = _location_value(line.split(']]', 1)[1])
+            if name and name not in geocoding:
+                geocoding[name] = geo_pool.submit(get_coordinates_from_name, name)
+
+    if transcribed_text:
+        print("Using cached transcription of this image.")
+    else:
+        try:
+            from google import genai
+            client = genai.Client(api_key=api_key)
         
-        # 2.1 Perform Spell Check with Gemini
-        if not transcribed_text.startswith("OCR Failed:"):
-            print("Performing spell check...")
-            try:
-                spell_check_prompt = (
-                    "You are a spell checker for a transcription of a handwritten journal. "
-                    "Your goal is to correct any clear spelling errors (like typos or missing letters) while preserving the original context. "
-                    "If a word is spelled correctly, or if it is an intentional variant common in magickal journals (like 'magick'), leave it as is. "
-                    "Provide the corrected text directly. Do NOT use any special notation like {{OriginalWord}} to highlight changes. "
-                    "Preserve all formatting, including timestamps which MUST be in the format [[ YYYY/MM/DD HH:MM:SS TZ ]] (with exactly one space after [[ and before ]]) and any bullet points. "
-                    "Do not add any conversational filler. Only output the corrected text."
-                )
-                
-                spell_check_response = generate_content_with_retry(
+            # A spell check that failed last time doesn't need a new OCR
+            transcribed_text = cache_get(ocr_key)
+            if transcribed_text:
+                print("Using cached OCR of this image.")
+            else:
+                print("Reading text from image...")
+                # Raw bytes for the SDK, downscaled only when the photo is larger than OCR needs
+                mime_type = mimetypes.guess_type(image_path)[0] or 'image/jpeg'
+                img = ocr_image_part(image_data, mime_type, image)
+            
+                response = generate_content_with_retry(
                     client=client,
                     models=models,
-                    contents=[spell_check_prompt, transcribed_text],
-                    failed_models=failed_models
+                    contents=[OCR_PROMPT, img],
+                    failed_models=failed_models,
+                    on_text=scan_text
                 )
-                transcribed_text = spell_check_response.text.strip()
-            except Exception as e:
-                print(f"Error during spell check: {e}")
-    except Exception as e:
-        print(f"Error during OCR: {e}")
-        transcribed_text = f"OCR Failed: {e}"
+                scan_text('\n')
+                transcribed_text = response.text.strip()
+                cache_put(ocr_key, transcribed_text)
+        
+            # 2.1 Perform Spell Check with Gemini
+            if not transcribed_text.startswith("OCR Failed:"):
+                print("Performing spell check...")
+                try:
+                    spell_check_response = generate_content_with_retry(
+                        client=client,
+                        models=models,
+                        contents=[SPELL_CHECK_PROMPT, transcribed_text],
+                        failed_models=failed_models,
+                        on_text=scan_text
+                    )
+                    scan_text('\n')
+                    transcribed_text = spell_check_response.text.strip()
+                    cache_put(checked_key, transcribed_text)
+                except Exception as e:
+                    print(f"Error during spell check: {e}")
+        except Exception as e:
+            print(f"Error during OCR: {e}")
+            transcribed_text = f"OCR Failed: {e}"
+    geo_pool.shutdown(wait=False)
     
     print("Transcription (and spell check) complete.")
     print("-" * 20)
@@ -361,11 +886,10 @@ def process_image(image_path, models=None, failed_models=None):
     
     # Extract date from first timestamp
     post_date = datetime.date.today()
-    ts_match = re.search(r'\[\[\s*(\d{4}/\d{2}/\d{2})', transcribed_text)
+    ts_match = _FIRST_TS_RE.search(transcribed_text)
     if ts_match:
         try:
-            date_str = ts_match.group(1).replace('/', '-')
-            post_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+            post_date = datetime.date(*map(int, ts_match.groups()))
             print(f"Detected date from timestamp: {post_date}")
         except ValueError:
             print("Error parsing date from timestamp, defaulting to today.")
@@ -375,155 +899,96 @@ def process_image(image_path, models=None, failed_models=None):
     # Now we can name the image and post
     # dest_image_name = f"{post_date_str}-{filename}" # Old way
     
-    dest_image_name = optimize_image(image_path, dest_img_dir, f"{post_date_str}-{base_name}")
+    dest_image_name = optimize_image(image_path, dest_img_dir, f"{post_date_str}-{base_name}", image_data, webp_future, digest)
     dest_image_path = os.path.join(dest_img_dir, dest_image_name) # For reference if needed
 
     # 2.5 Parse Transcription and Insert Astro Data per Timestamp
-    lines = transcribed_text.split('\n')
-    processed_blocks = []
-    current_block = []
-    
-    # Regex to find [[ YYYY/MM/DD ... ]] - allowing optional leading bullet/space
-    # Also support space delimiters in date YYYY MM DD
-    ts_pattern = re.compile(r'.*?\[\[\s*(\d{4}[/ ]\d{2}[/ ]\d{2})')
+    blocks = split_blocks(transcribed_text)
 
-    def flush_block(block_lines):
-        if not block_lines:
-            return ""
-        
-        # Split first line into [[ Timestamp ]] and trailing text
-        first_line = block_lines[0].strip()
-        # Pattern to capture optional prefix/bullet, the timestamp (flexible), and then trailing text
-        ts_split_pattern = re.compile(r'^(.*?)(\[\[\s*\d{4}[/ ]\d{2}[/ ]\d{2}.*?\s*\]\])(.*)')
-        match = ts_split_pattern.match(first_line)
-        
-        if match:
-            prefix = match.group(1)
-            ts_full = match.group(2)
-            
-            # Extract date
-            date_captured_match = re.search(r'(\d{4})[/ ](\d{2})[/ ](\d{2})', ts_full)
-            if date_captured_match:
-                y, m, d = int(date_captured_match.group(1)), int(date_captured_match.group(2)), int(date_captured_match.group(3))
-                date_obj = datetime.date(y, m, d)
-                date_str = date_obj.isoformat()
-                day_of_week = date_obj.strftime('%A')
-            else:
-                date_obj = datetime.date.today()
-                date_str = date_obj.isoformat()
-                day_of_week = date_obj.strftime('%A')
+    # Republishing a page reuses the weather already written into its post
+    posts_dir = os.path.join("content", "posts")
+    known_weather = previous_weather(os.path.join(posts_dir, f"{post_date_str}-{base_name}.md"))
+
+    # All network lookups are made up front, concurrently
+    coords_cache, weather_cache = prefetch_block_lookups(blocks, geocoding, known_weather)
+
+    def geocode(place_name):
+        if place_name not in coords_cache:
+            coords_cache[place_name] = get_coordinates_from_name(place_name)
+        return coords_cache[place_name]
 
-            trailing_text = match.group(3).strip()
+    def flush_block(header, block_lines):
+        if header is not None:
+            prefix, ts_full, trailing_text = header.prefix, header.ts_full, header.trailing
+            
+            # Date as captured when the timestamp was found
+            date_obj = datetime.date(*map(int, header.date_groups))
+            date_str = date_obj.isoformat()
+            day_of_week = date_obj.strftime('%A')
             
             # Defaults
             lat = DEFAULT_LAT
             lon = DEFAULT_LON
             loc_name = DEFAULT_LOCATION_NAME
             
-            # Scan for override
-            lines_to_keep = []
-            
-            def is_location_line(text):
-                return text.strip().startswith(('* Location:', '- Location:', '• Location:'))
-
-            # Check trailing text first (rarely has location but possible)
-            if trailing_text and is_location_line(trailing_text):
-                 loc_val = trailing_text.split(':', 1)[1].strip()
-                 if loc_val:
-                     loc_name = loc_val
-                     new_coords = get_coordinates_from_name(loc_name)
-                     if new_coords:
-                         lat, lon = new_coords
-                 trailing_text = "" 
-
-            # Check rest of lines
-            for line in block_lines[1:]:
-                if is_location_line(line):
-                    loc_val = line.strip().split(':', 1)[1].strip()
+            bullets = []
+            remainder = []
+
+            # One pass over the trailing text (rarely has location but possible) and the
+            # rest of the block: location overrides, list items and everything else
+            block_rest = block_lines[1:]
+            if trailing_text:
+                block_rest = [trailing_text] + block_rest
+            for line in block_rest:
+                clean = line.strip()
+                if clean.startswith(('* Location:', '- Location:', '• Location:')):
+                    loc_val = clean.split(':', 1)[1].strip()
                     if loc_val:
                         loc_name = loc_val
-                        new_coords = get_coordinates_from_name(loc_name)
+                        new_coords = geocode(loc_name)
                         if new_coords:
                             lat, lon = new_coords
-                else:
-                    lines_to_keep.append(line)
+                elif clean.startswith(('*', '-', '•')):
+                    bullets.append(clean)
+                elif clean:
+                    remainder.append(line)
+
+            # The list under the timestamp, collected as lines and joined once
+            list_lines = []
 
             # Fetch weather data
-            dt_match = re.search(r'(\d{4})/(\d{2})/(\d{2})\s+(\d{2}):(\d{2}):(\d{2})', ts_full)
-            weather_block = ""
+            dt_match = header.dt_match
             if dt_match:
                 y, m, d, H, M, S = map(int, dt_match.groups())
                 dt = datetime.datetime(y, m, d, H, M, S)
-                temp, condition = get_weather_data(dt, lat, lon)
-                weather_block = f"  * Location: {loc_name}\n  * Temperature: {temp}\n  * Weather Condition: {condition}\n"
-
-            astro_data = get_astro_data(date_str, lat, lon).strip()
-            
-            # Combine
-            meta_data = f"{weather_block}{astro_data}\n  * Day of Week: {day_of_week}"
-            
-            bullets = []
-            remainder = []
-            
-            def is_bullet(text):
-                t = text.strip()
-                return t.startswith(('*', '-', '•'))
-
-            if trailing_text:
-                if is_bullet(trailing_text):
-                    bullets.append(trailing_text.strip())
+                day = (lat, lon, dt.strftime("%Y-%m-%d"))
+                if (ts_full, loc_name) in known_weather:
+                    temp, condition = known_weather[(ts_full, loc_name)]
+                elif day in weather_cache:
+                    temp, condition = weather_at_hour(weather_cache[day], dt.hour)
                 else:
-                    remainder.append(trailing_text)
-                
-            for line in lines_to_keep:
-                if is_bullet(line):
-                    bullets.append(line.strip())
-                elif line.strip():
-                    remainder.append(line)
-            
-            # Combine list items
-            list_content = meta_data
-            if bullets:
-                if list_content and not list_content.endswith('\n'):
-                    list_content += "\n"
-                list_content += "\n".join("  " + b for b in bullets)
+                    temp, condition = get_weather_data(dt, lat, lon)
+                list_lines += [f"  * Location: {loc_name}", f"  * Temperature: {temp}", f"  * Weather Condition: {condition}"]
+
+            list_lines.append(get_astro_data(date_str, lat, lon).strip())
+            list_lines.append(f"  * Day of Week: {day_of_week}")
+            list_lines.extend("  " + b for b in bullets)
+            list_content = "\n".join(list_lines)
             
             # Ensure blank line between timestamp and list
-            final_section = f"{prefix}{ts_full}\n\n{list_content.strip()}"
-            
+            sections = [f"{prefix}{ts_full}", list_content.strip()]
             if remainder:
-                final_section += "\n\n" + "\n".join(remainder)
-                
-            return final_section
+                sections.append("\n".join(remainder))
+            return "\n\n".join(sections)
         else:
             return "\n".join(block_lines)
 
-
-    for line in lines:
-        if ts_pattern.match(line.strip()):
-            if current_block:
-                processed_blocks.append(flush_block(current_block))
-                current_block = []
-        current_block.append(line)
-    
-    if current_block:
-        processed_blocks.append(flush_block(current_block))
+    processed_blocks = [flush_block(header, block_lines) for header, block_lines in blocks]
 
     final_body = "\n\n".join(processed_blocks)
 
     # 3. Create Markdown Post
-    posts_dir = os.path.join("content", "posts")
     os.makedirs(posts_dir, exist_ok=True)
-    
-    post_filename = f"{post_date_str}-{base_name}.md"
-    post_path = os.path.join(posts_dir, post_filename)
-    
-    # Check if file exists to avoid overwrite? Or just overwrite? 
-    # We'll append timestamp if it exists to be safe.
-    if os.path.exists(post_path):
-        timestamp = datetime.datetime.now().strftime("%H%M%S")
-        post_filename = f"{post_date_str}-{base_name}-{timestamp}.md"
-        post_path = os.path.join(posts_dir, post_filename)
 
     # Image URL for HTML (relative to the site root)
     img_url = f"static/images/{dest_image_name}"
@@ -544,14 +1009,28 @@ future: {str(is_future).lower()}
 {final_body}
 """
     
-    with open(post_path, 'w') as f:
-        f.write(markdown_content)
+    # Never overwrite an existing post; append a timestamp instead.
+    # Exclusive create checks and creates in one step.
+    # Encoded once up front: UTF-8 whatever the locale, and a single write
+    post_bytes = markdown_content.encode('utf-8')
+    now = datetime.datetime.now()
+    for suffix in ("", now.strftime("-%H%M%S"), now.strftime("-%H%M%S-%f")):
+        post_path = os.path.join(posts_dir, f"{post_date_str}-{base_name}{suffix}.md")
+        try:
+            with open(post_path, 'xb') as f:
+                f.write(post_bytes)
+            break
+        except FileExistsError:
+            continue
+    else:
+        raise FileExistsError(f"Could not create a post for {image_path}: {post_path} and the names before it already exist")
     
     print(f"Post created at {post_path}")
 
     # 4. Rebuild Site
     print("Rebuilding site...")
-    build.build()
+    import build
+    build.build_post(post_path)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Publish a new journal entry from an image.")
@@ -2,14 +2,49 @@
 import sys
 import os
 import re
+import shutil
 import datetime
 import time
 from google import genai
 from google.genai import errors
-from PIL import Image
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 import publish
 import build
 
+# Precompiled patterns, shared by every block and post
+_RETRY_DELAY_RE = re.compile(r'retry in (\d+(\.\d+)?)s')
+# Blocks are split at timestamp lines by publish.split_blocks; dates may use space delimiters
+_DATETIME_RE = re.compile(r'(\d{4})[/ ](\d{2})[/ ](\d{2})\s+(\d{2}):(\d{2}):(\d{2})')
+_FIRST_TS_RE = re.compile(r'\[\[\s*(\d{4})[/ ](\d{2})[/ ](\d{2})')
+_FILE_DATE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})')
+_IMAGE_LINE_RE = re.compile(r'^image:\s*(.*)', re.MULTILINE)
+
+# Posts a bulk run has Gemini transcribing at once
+BULK_TRANSCRIBE_WORKERS = 2
+
+# Leading markers of a location override and of any other list item
+_LOCATION_PREFIXES = ('* Location:', '- Location:', '• Location:')
+_BULLET_PREFIXES = ('*', '-', '•')
+
+def frontmatter_image(post_path):
+    """
+    Returns the image: path from a post's frontmatter, or None.
+    Reading stops where the frontmatter ends, so the body is never loaded.
+    """
+    with open(post_path, 'r', encoding='utf-8') as f:
+        delimiters = 0
+        for line in f:
+            if line.startswith('---'):
+                delimiters += 1
+                if delimiters == 2:
+                    break
+                continue
+            match = _IMAGE_LINE_RE.match(line)
+            if match:
+                return match.group(1).strip()
+    return None
+
 def generate_content_with_retry(client, model, contents, retries=3):
     # Note: This local function seems to take a single 'model' string, not a list.
     # But for consistency with the robust logic, we should probably handle it similarly if we were using it.
@@ -27,7 +62,7 @@ def generate_content_with_retry(client, model, contents, retries=3):
                 delay = 60 # Default to 60s
                 
                 # Extract retry delay from error message
-                match = re.search(r'retry in (\d+(\.\d+)?)s', str(e))
+                match = _RETRY_DELAY_RE.search(str(e))
                 if match:
                     delay = float(match.group(1)) + 2 # Add 2s buffer
                 
@@ -44,7 +79,53 @@ def generate_content_with_retry(client, model, contents, retries=3):
                 print(f"ClientError {e.code}: {e}")
                 raise
 
-def reprocess(post_path, image_path, models=None, failed_models=None):
+def transcribe(image_path, client, models, failed_models=None):
+    """
+    Runs the Gemini OCR and spell check on an image and returns the corrected text.
+    Results are cached by image content, shared with publish.py, so an unchanged
+    image is only sent again when the prompts or models change.
+    """
+    with open(image_path, 'rb') as f:
+        image_data = f.read()
+    ocr_key, checked_key = publish.transcription_cache_keys(publish.image_digest(image_data), models)
+    transcribed_text = publish.cache_get(checked_key)
+    if transcribed_text:
+        print("Using cached transcription of this image.")
+        return transcribed_text
+
+    transcribed_text = publish.cache_get(ocr_key)
+    if transcribed_text:
+        print("Using cached OCR of this image.")
+    else:
+        # Downscaled for OCR, like publish.py does
+        mime_type = mimetypes.guess_type(image_path)[0] or 'image/jpeg'
+        img = publish.ocr_image_part(image_data, mime_type)
+        
+        print("Running Gemini OCR...")
+        response = publish.generate_content_with_retry(
+            client=client,
+            models=models,
+            contents=[publish.OCR_PROMPT, img],
+            failed_models=failed_models
+        )
+        transcribed_text = response.text.strip()
+        publish.cache_put(ocr_key, transcribed_text)
+    
+    print("Running Gemini Spell Check...")
+    spell_check_response = publish.generate_content_with_retry(
+        client=client,
+        models=models,
+        contents=[publish.SPELL_CHECK_PROMPT, transcribed_text],
+        failed_models=failed_models
+    )
+    transcribed_text = spell_check_response.text.strip()
+    publish.cache_put(checked_key, transcribed_text)
+    return transcribed_text
+
+def reprocess(post_path, image_path, models=None, failed_models=None, client=None, rebuild=True, transcription=None):
+    """
+    Re-transcribes a post from its image and rewrites it. Returns whether the post was updated.
+    """
     if models is None:
         models = publish.DEFAULT_MODELS
 
@@ -53,218 +134,166 @@ def reprocess(post_path, image_path, models=None, failed_models=None):
     if not post_path.endswith('.md'):
         print(f"Error: First argument '{post_path}' does not look like a markdown file (.md).")
         print("Usage: python reprocess.py <post_path> <image_path>")
-        return
+        return False
 
     if not os.path.exists(post_path):
         print(f"Error: Post {post_path} not found.")
-        return
+        return False
     if not os.path.exists(image_path):
         print(f"Error: Image {image_path} not found.")
-        return
+        return False
 
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         print("Error: GEMINI_API_KEY environment variable not set.")
-        return
+        return False
 
-    # 1. Perform OCR
-    client = genai.Client(api_key=api_key)
-    img = Image.open(image_path)
-    
-    print("Running Gemini OCR...")
-    response = publish.generate_content_with_retry(
-        client=client,
-        models=models,
-        contents=[
-            "Transcribe the handwritten text in this image. This is a magickal journal entry. Rules: 1. Transcribe EXACTLY as written, including idiosyncratic spellings like 'candel', 'magick', 'sunrises'. 2. Format timestamps in double brackets with exactly one space after [[ and before ]], like this: [[ YYYY/MM/DD HH:MM:SS EST ]]. Pay close attention to the time digits. If you see a 'T' between the date and time, ignore it and use a space. 3. Do not add any conversational filler. 4. If you see text in double quotes like \"\"TITLE\"\", remove the quotes and place the TITLE text immediately before the timestamp on the same line, like: TITLE [[ YYYY/... ]].", 
-            img
-        ],
-        failed_models=failed_models
-    )
-    transcribed_text = response.text.strip()
-    
-    print("Running Gemini Spell Check...")
-    spell_check_prompt = (
-        "You are a spell checker for a transcription of a handwritten journal. "
-        "Your goal is to correct any clear spelling errors (like typos or missing letters) while preserving the original context. "
-        "If a word is spelled correctly, or if it is an intentional variant common in magickal journals (like 'magick'), leave it as is. "
-        "Provide the corrected text directly. Do NOT use any special notation like {{OriginalWord}} to highlight changes. "
-        "Preserve all formatting, including timestamps which MUST be in the format [[ YYYY/MM/DD HH:MM:SS TZ ]] (with exactly one space after [[ and before ]]) and any bullet points. "
-        "Do not add any conversational filler. Only output the corrected text."
-    )
-    spell_check_response = publish.generate_content_with_retry(
-        client=client,
-        models=models,
-        contents=[spell_check_prompt, transcribed_text],
-        failed_models=failed_models
-    )
-    transcribed_text = spell_check_response.text.strip()
+    # 1. Perform OCR (transcription is a transcribe() future when a bulk run started it ahead)
+    if transcription is not None:
+        transcribed_text = transcription.result()
+    else:
+        if client is None:
+            client = genai.Client(api_key=api_key)
+        transcribed_text = transcribe(image_path, client, models, failed_models)
 
     # 2. Process blocks
-    lines = transcribed_text.split('\n')
-    processed_blocks = []
-    current_block = []
-    
-    # Regex to find [[ YYYY/MM/DD ... ]] - allowing optional leading bullet/space
-    # Also support space delimiters in date YYYY MM DD
-    ts_pattern = re.compile(r'.*?\[[\\\]\s*(\d{4}[/ ]\d{2}[/ ]\d{2})')
-
-    def flush_block_local(block_lines):
-        if not block_lines: return ""
-        first_line = block_lines[0].strip()
-        # Regex to capture prefix, timestamp (flexible delimiters), and trailing text
-        ts_split_pattern = re.compile(r'^(.*?)(\[[\\\]\s*\d{4}[/ ]\d{2}[/ ]\d{2}.*?\s*\]\])(.*)')
-        match = ts_split_pattern.match(first_line)
-        if match:
-            prefix = match.group(1)
-            ts_full = match.group(2)
+    # Blocks start at timestamp lines, found in one pass over the text
+    blocks = publish.split_blocks(transcribed_text)
+
+    # Each place is geocoded once, and each location's days of weather fetched in
+    # one request, all at the same time before the blocks are written
+    loc_cache, weather_cache = publish.prefetch_block_lookups(blocks)
+
+    def geocode(place_name):
+        return loc_cache[place_name]
+
+    # Blocks without a location override, the usual case, use these as they are
+    default_lat, default_lon, default_name = publish.DEFAULT_LAT, publish.DEFAULT_LON, publish.DEFAULT_LOCATION_NAME
+
+    def flush_block_local(header, block_lines):
+        if header:
+            prefix = header.prefix
+            ts_full = header.ts_full
             
-            # Extract date for processing
-            date_captured_match = re.search(r'(\d{4})[/ ](\d{2})[/ ](\d{2})', ts_full)
-            if date_captured_match:
-                # Create a date object to get the day of week
-                y, m, d = int(date_captured_match.group(1)), int(date_captured_match.group(2)), int(date_captured_match.group(3))
-                date_obj = datetime.date(y, m, d)
-                date_str = date_obj.isoformat()
-                day_of_week = date_obj.strftime('%A') # Full day name (e.g., Monday)
-            else:
-                date_obj = datetime.date.today()
-                date_str = date_obj.isoformat()
-                day_of_week = date_obj.strftime('%A')
+            # Create a date object to get the day of week
+            y, m, d = map(int, header.date_groups)
+            date_obj = datetime.date(y, m, d)
+            date_str = date_obj.isoformat()
+            day_of_week = date_obj.strftime('%A') # Full day name (e.g., Monday)
 
-            trailing_text = match.group(3).strip()
+            trailing_text = header.trailing
             
-            lat = publish.DEFAULT_LAT
-            lon = publish.DEFAULT_LON
-            loc_name = publish.DEFAULT_LOCATION_NAME
+            lat, lon, loc_name = default_lat, default_lon, default_name
             
-            lines_to_keep = []
-            def is_location_line(text):
-                return text.strip().startswith(('* Location:', '- Location:', '• Location:'))
-
-            if trailing_text and is_location_line(trailing_text):
-                 loc_val = trailing_text.split(':', 1)[1].strip()
-                 if loc_val:
-                     loc_name = loc_val
-                     new_coords = publish.get_coordinates_from_name(loc_name)
-                     if new_coords: lat, lon = new_coords
-                 trailing_text = "" 
-
-            for line in block_lines[1:]:
-                if is_location_line(line):
-                    loc_val = line.strip().split(':', 1)[1].strip()
+            bullets = []
+            remainder = []
+
+            # One pass over the trailing text and the rest of the block, stripping each
+            # line once: location overrides, list items and everything else
+            block_rest = block_lines[1:]
+            if trailing_text:
+                block_rest = [trailing_text] + block_rest
+            for line in block_rest:
+                clean = line.strip()
+                if clean.startswith(_LOCATION_PREFIXES):
+                    loc_val = clean.split(':', 1)[1].strip()
                     if loc_val:
                         loc_name = loc_val
-                        new_coords = publish.get_coordinates_from_name(loc_name)
+                        new_coords = geocode(loc_name)
                         if new_coords: lat, lon = new_coords
-                else:
-                    lines_to_keep.append(line)
+                elif clean.startswith(_BULLET_PREFIXES):
+                    bullets.append(clean)
+                elif clean:
+                    remainder.append(line)
+
+            # The list under the timestamp, collected as lines and joined once
+            list_lines = []
 
-            dt_match = re.search(r'(\d{4})[/ ](\d{2})[/ ](\d{2})\s+(\d{2}):(\d{2}):(\d{2})', ts_full)
-            weather_block = ""
+            dt_match = _DATETIME_RE.search(ts_full)
             if dt_match:
                 y, m, d, H, M, S = map(int, dt_match.groups())
                 dt = datetime.datetime(y, m, d, H, M, S)
-                temp, condition = publish.get_weather_data(dt, lat, lon)
-                weather_block = f"  * Location: {loc_name}\n  * Temperature: {temp}\n  * Weather Condition: {condition}\n"
+                day = (lat, lon, dt.strftime("%Y-%m-%d"))
+                if day in weather_cache:
+                    temp, condition = publish.weather_at_hour(weather_cache[day], dt.hour)
+                else:
+                    temp, condition = publish.get_weather_data(dt, lat, lon)
+                list_lines += [f"  * Location: {loc_name}", f"  * Temperature: {temp}", f"  * Weather Condition: {condition}"]
 
-            astro_data = publish.get_astro_data(date_str, lat, lon).strip()
+            list_lines.append(publish.get_astro_data(date_str, lat, lon).strip())
             # Insert Day of Week
-            meta_data = f"{weather_block}{astro_data}\n  * Day of Week: {day_of_week}"
+            list_lines.append(f"  * Day of Week: {day_of_week}")
             
-            bullets = []
-            remainder = []
-            def is_bullet(text):
-                t = text.strip()
-                return t.startswith(('*', '-', '•'))
-
-            if trailing_text:
-                if is_bullet(trailing_text): bullets.append(trailing_text.strip())
-                else: remainder.append(trailing_text)
-                
-            for line in lines_to_keep:
-                if is_bullet(line): bullets.append(line.strip())
-                elif line.strip(): remainder.append(line)
+            list_lines.extend("  " + b for b in bullets)
             
-            list_content = meta_data
-            if bullets:
-                if list_content and not list_content.endswith('\n'): list_content += "\n"
-                list_content += "\n".join("  " + b for b in bullets)
-            
-            final_section = f"{prefix}{ts_full}\n\n{list_content.strip()}"
-            if remainder: final_section += "\n\n" + "\n".join(remainder)
-            return final_section
+            sections = [f"{prefix}{ts_full}", "\n".join(list_lines).strip()]
+            if remainder: sections.append("\n".join(remainder))
+            return "\n\n".join(sections)
         else:
             return "\n".join(block_lines)
 
-    for line in lines:
-        if ts_pattern.match(line.strip()):
-            if current_block:
-                processed_blocks.append(flush_block_local(current_block))
-                current_block = []
-        current_block.append(line)
-    if current_block:
-        processed_blocks.append(flush_block_local(current_block))
+    processed_blocks = [flush_block_local(header, block_lines) for header, block_lines in blocks]
 
     final_body = "\n\n".join(processed_blocks)
 
     # 3. Update the post file
-    with open(post_path, 'r') as f:
+    with open(post_path, 'r', encoding='utf-8') as f:
         old_content = f.read()
 
-    # Split frontmatter
-    parts = old_content.split('---', 2)
-    if len(parts) >= 3:
-        frontmatter_raw = parts[1]
+    # Only the frontmatter is kept, so the old body is never copied out
+    fm_start = old_content.find('---')
+    fm_end = old_content.find('---', fm_start + 3) if fm_start != -1 else -1
+    if fm_end != -1:
+        frontmatter_raw = old_content[fm_start + 3:fm_end]
         
         # Check for future date in the new body
         is_future = False
         extracted_date = None
         
-        first_ts_match = re.search(r'\[[\\\]\s*(\d{4}[/ ]\d{2}[/ ]\d{2})', final_body)
+        first_ts_match = _FIRST_TS_RE.search(final_body)
         if first_ts_match:
-            # Handle potential space delimiters in captured date for parsing
-            raw_date_str = first_ts_match.group(1)
-            norm_date_str = raw_date_str.replace(' ', '-')
-            ts_date_str = norm_date_str.replace('/', '-')
-            extracted_date = datetime.datetime.strptime(ts_date_str, "%Y-%m-%d").date()
+            # Year, month and day are captured separately, whatever the delimiters
+            extracted_date = datetime.date(*map(int, first_ts_match.groups()))
             if extracted_date > datetime.date.today():
                 is_future = True
                 print(f"Warning: Extracted date {extracted_date} is in the future!")
         
-        # Update or add 'future' key and 'date' key in frontmatter
-        lines = frontmatter_raw.strip().split('\n')
-        new_lines = []
-        future_found = False
-        date_found = False
-        
-        for line in lines:
-            if line.startswith('future:'):
-                new_lines.append(f"future: {str(is_future).lower()}")
-                future_found = True
-            elif line.startswith('date:') and extracted_date:
-                new_lines.append(f"date: {extracted_date.isoformat()}")
-                date_found = True
-            else:
-                new_lines.append(line)
-        
-        if not future_found:
-            new_lines.append(f"future: {str(is_future).lower()}")
+        # Update or add 'future' key and 'date' key in frontmatter, in one pass
+        future_line = f"future: {str(is_future).lower()}"
+        new_lines = [future_line if line.startswith('future:')
+                     else f"date: {extracted_date.isoformat()}" if extracted_date and line.startswith('date:')
+                     else line
+                     for line in frontmatter_raw.strip().split('\n')]
+        if future_line not in new_lines:
+            new_lines.append(future_line)
         
         new_frontmatter = "\n".join(new_lines)
-        new_content = f"---\n{new_frontmatter}\n---\n\n{final_body}\n"
-        with open(post_path, 'w') as f:
-            f.write(new_content)
+        # Written next to the post and renamed over it, so a crash never leaves half a post
+        tmp_path = post_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(f"---\n{new_frontmatter}\n---\n\n{final_body}\n")
+            # Keep the post's permissions rather than the umask default
+            shutil.copymode(post_path, tmp_path)
+            os.replace(tmp_path, post_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
         print(f"Updated {post_path}")
     else:
         print("Error: Could not parse frontmatter from old post.")
+        return False
 
-    # 4. Rebuild
-    build.build(force=True)
+    # 4. Rebuild (bulk runs do it once, after the last post)
+    if rebuild:
+        build.build(force=True)
+    return True
 
 if __name__ == "__main__":
     import argparse
-    import glob
     
     parser = argparse.ArgumentParser(description='Reprocess existing posts using OCR on their associated images.')
     parser.add_argument('post_path', nargs='?', help='Path to the existing markdown post to update (optional if --all is used)')
@@ -293,12 +322,17 @@ if __name__ == "__main__":
             print(f"Warning: Model '{args.model}' not found in default list. Using it as a custom single model.")
             models = [args.model]
     
+    # Models that recently answered 404 or ran out of quota, in this run or an earlier
+    # one, are skipped, unless that is all of them
     failed_models = set()
+    recent = publish.known_failed_models()
+    if not set(models) <= recent:
+        failed_models |= recent
 
     target_date = None
     if args.date:
         try:
-            target_date = datetime.datetime.strptime(args.date, "%Y-%m-%d").date()
+            target_date = datetime.date.fromisoformat(args.date)
         except ValueError:
             print("Error: Date format must be YYYY-MM-DD")
             sys.exit(1)
@@ -309,8 +343,9 @@ if __name__ == "__main__":
             print(f"Error: {posts_dir} does not exist.")
             sys.exit(1)
             
-        md_files = glob.glob(os.path.join(posts_dir, '*.md'))
-        md_files.sort() # Sort by filename (date)
+        with os.scandir(posts_dir) as it:
+            md_files = sorted(os.path.join(posts_dir, e.name) for e in it
+                              if e.name.endswith('.md') and not e.name.startswith('.')) # Sort by filename (date)
         
         if args.latest and md_files:
             md_files = [md_files[-1]]
@@ -320,15 +355,21 @@ if __name__ == "__main__":
             sys.exit(0)
 
         print(f"Found {len(md_files)} posts to process.")
+
+        # One Gemini client for all posts, so its HTTPS connections are reused
+        api_key = os.environ.get("GEMINI_API_KEY")
+        client = genai.Client(api_key=api_key) if api_key else None
         
+        # ISO dates compare correctly as strings
+        target_prefix = target_date.isoformat() if target_date else None
         count = 0
+        jobs = []
         for post_file in md_files:
-            if target_date:
+            if target_prefix:
                 filename = os.path.basename(post_file)
-                match = re.match(r'^(\d{4}-\d{2}-\d{2})', filename)
+                match = _FILE_DATE_RE.match(filename)
                 if match:
-                    file_date = datetime.datetime.strptime(match.group(1), "%Y-%m-%d").date()
-                    if file_date < target_date:
+                    if match.group(1) < target_prefix:
                         continue
                 else:
                     # If date filtering is on, skip files without date
@@ -337,30 +378,45 @@ if __name__ == "__main__":
             count += 1
             # We need to find the image path from the post content
             try:
-                with open(post_file, 'r') as f:
-                    content = f.read()
-                
-                # Simple parsing for image: path
-                image_match = re.search(r'^image:\s*(.*)', content, re.MULTILINE)
-                if image_match:
-                    img_rel_path = image_match.group(1).strip()
-                    # image path in md is usually relative to site root (static/images/...)
-                    # our script expects path relative to CWD
-                    if os.path.exists(img_rel_path):
-                        print(f"\n--- Reprocessing {post_file} ---")
-                        reprocess(post_file, img_rel_path, models=models, failed_models=failed_models)
-                        # Sleep to avoid rate limits (2 calls per reprocess)
-                        if len(md_files) > 1:
-                            time.sleep(10)
-                    else:
-                        print(f"Warning: Image {img_rel_path} not found for {post_file}, skipping.")
-                else:
-                    print(f"Warning: No image found in frontmatter for {post_file}, skipping.")
+                img_rel_path = frontmatter_image(post_file)
             except Exception as e:
                 print(f"Error processing {post_file}: {e}")
+                continue
+            if img_rel_path is None:
+                print(f"Warning: No image found in frontmatter for {post_file}, skipping.")
+            # image path in md is usually relative to site root (static/images/...)
+            # our script expects path relative to CWD
+            elif not os.path.exists(img_rel_path):
+                print(f"Warning: Image {img_rel_path} not found for {post_file}, skipping.")
+            else:
+                jobs.append((post_file, img_rel_path))
         
         if count == 0 and args.date:
             print(f"No posts found from {args.date} onwards.")
+
+        # Gemini transcribes the next posts while this thread writes the current one;
+        # blocks (ephem, lookups) and the post files are still handled one at a time, in order.
+        # Rate limits are handled by the retry on 429, which waits as long as the API asks.
+        reprocessed = 0
+        pool = ThreadPoolExecutor(max_workers=BULK_TRANSCRIBE_WORKERS)
+        try:
+            transcriptions = [pool.submit(transcribe, img_rel_path, client, models, failed_models) if client else None
+                              for _, img_rel_path in jobs]
+            for (post_file, img_rel_path), transcription in zip(jobs, transcriptions):
+                print(f"\n--- Reprocessing {post_file} ---")
+                try:
+                    if reprocess(post_file, img_rel_path, models=models, failed_models=failed_models,
+                                 client=client, rebuild=False, transcription=transcription):
+                        reprocessed += 1
+                except Exception as e:
+                    print(f"Error processing {post_file}: {e}")
+        finally:
+            # An interrupted run doesn't go on transcribing posts it won't write
+            pool.shutdown(cancel_futures=True)
+
+        # One rebuild covers every post updated above
+        if reprocessed:
+            build.build(force=True)
                 
     else:
         if not args.post_path or not args.image_path: